@@ -0,0 +1,118 @@
+# admission.py
+# Checks an inbound webhook passes before any real work: Twilio replays a MessageSid when we
+# answer slowly, one busy number must not use up the worker threads, and past MAX_IN_FLIGHT
+# concurrent messages the cheapest answer is a canned one.
+import threading
+from cache import LRUCache
+from ratelimit import TokenBucket
+from config import (
+    IDEMPOTENCY_SIZE, IDEMPOTENCY_TTL, REPLAY_WAIT, SENDER_RATE, SENDER_BURST, MAX_IN_FLIGHT, SESSION_MAX,
+)
+
+# Returned by claim() when the first delivery of a SID is still running
+IN_PROGRESS = object()
+
+# MessageSid -> TwiML we answered with
+_responses = LRUCache(maxsize=IDEMPOTENCY_SIZE, ttl=IDEMPOTENCY_TTL)
+# MessageSid -> Event set when its first delivery finishes
+_pending = {}
+# sender -> TokenBucket; a bucket that falls out is equivalent to a full one
+_buckets = LRUCache(maxsize=SESSION_MAX)
+_lock = threading.Lock()
+_in_flight = 0
+_counts = {"replayed": 0, "throttled": 0, "shed": 0}
+
+
+def claim(sid, wait=REPLAY_WAIT):
+    """
+    None if the caller should process this message (and later complete() or release() it);
+    otherwise the stored TwiML for a replayed SID, or IN_PROGRESS if the first delivery is
+    still running after `wait` seconds.
+    """
+    if not sid:
+        return None
+    while True:
+        body = _responses.get(sid)
+        if body is None:
+            with _lock:
+                # complete() stores the response before dropping the pending entry, so a
+                # response that landed since the first look is seen here, not re-processed
+                body = _responses.get(sid)
+                event = _pending.get(sid) if body is None else None
+                if body is None and event is None:
+                    _pending[sid] = threading.Event()
+                    return None
+        if body is not None:
+            _count("replayed")
+            return body
+        if not wait or not event.wait(wait):
+            _count("replayed")
+            return IN_PROGRESS
+        # the first delivery failed without storing a response: the retry takes over
+
+
+def complete(sid, body):
+    """Remember the response for `sid` and wake any retries waiting on it."""
+    if not sid:
+        return
+    _responses.set(sid, body)
+    release(sid)
+
+
+def release(sid):
+    """Give up a claim without storing a response (the next retry processes it again)."""
+    with _lock:
+        event = _pending.pop(sid, None)
+    if event is not None:
+        event.set()
+
+
+def allow_sender(sender):
+    """Take a token from the sender's bucket (SENDER_RATE per second, bursts of SENDER_BURST)."""
+    if not SENDER_RATE or not sender:
+        return True
+    bucket = _buckets.get(sender)
+    if bucket is None:
+        with _lock:
+            bucket = _buckets.get(sender)
+            if bucket is None:
+                bucket = TokenBucket(SENDER_RATE, SENDER_BURST)
+                _buckets.set(sender, bucket)
+    if bucket.try_acquire():
+        return True
+    _count("throttled")
+    return False
+
+
+def enter():
+    """Reserve an in-flight slot; False (shed the message) once MAX_IN_FLIGHT are running."""
+    global _in_flight
+    with _lock:
+        if MAX_IN_FLIGHT and _in_flight >= MAX_IN_FLIGHT:
+            _counts["shed"] += 1
+            return False
+        _in_flight += 1
+        return True
+
+
+def leave():
+    global _in_flight
+    with _lock:
+        _in_flight -= 1
+
+
+def _count(outcome):
+    with _lock:
+        _counts[outcome] += 1
+
+
+def stats():
+    with _lock:
+        counts = dict(_counts, in_flight=_in_flight, pending=len(_pending))
+    counts["responses"] = _responses.stats()
+    return counts
+
+
+def clear():
+    _responses.clear()
+    _buckets.clear()
@@ -0,0 +1,240 @@
+# asgi.py
+# Async entry point serving the same "/" and "/webhook" routes as bot.create_app():
+#   uvicorn asgi:app --workers 2
+import asyncio
+from urllib.parse import parse_qsl
+import aiomysql
+from twilio.twiml.messaging_response import MessagingResponse
+import db
+import knowledge
+import replycache
+import intents
+import admission
+from bot import (
+    VACCINE_SCHEDULE, BUSY_REPLY, THROTTLED_REPLY, get_session, save_session, touch_session,
+    select_language, is_vaccine_query, split_symptoms, render_lookup, warm_up,
+)
+from config import MYSQL_CONFIG, MYSQL_ASYNC_POOL_SIZE, LOOKUP_BACKEND, RESULT_TOP_K, WARMUP_MODE
+from translation import translate_async
+
+
+_pool = None
+_background = []  # keeps the warm-up task referenced until it finishes
+
+
+async def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = await aiomysql.create_pool(
+            host=MYSQL_CONFIG["host"],
+            user=MYSQL_CONFIG["user"],
+            password=MYSQL_CONFIG["password"] or "",
+            db=MYSQL_CONFIG["database"],
+            minsize=1,
+            maxsize=MYSQL_ASYNC_POOL_SIZE,
+            autocommit=True,
+        )
+    return _pool
+
+
+async def _fetchall(query, params):
+    pool = await _get_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchall()
+
+
+def _dedup_rows(rows):
+    for row in rows:
+        if row.get("symptoms"):
+            row["symptoms"] = db._dedup_symptoms(row["symptoms"])
+    return rows
+
+
+async def _index():
+    # the first load and the periodic data_version check query MySQL
+    return await asyncio.to_thread(knowledge.get_index)
+
+
+async def get_disease_info(disease_name):
+    if LOOKUP_BACKEND != "db":
+        # a lookup right after a knowledge refresh also builds the new index's typo index
+        index = await _index()
+        return await asyncio.to_thread(index.disease_info, disease_name)
+    for mode in db._match_modes():
+        rows = await _fetchall(*db._disease_info_query(disease_name, mode))
+        if rows:
+            return _dedup_rows(rows[:1])[0]
+    return None
+
+
+async def get_diseases_by_multiple_symptoms(symptoms):
+    if LOOKUP_BACKEND != "db":
+        index = await _index()
+        return await asyncio.to_thread(index.ranked_diseases, symptoms, RESULT_TOP_K)
+    normalized = [db.normalize_word(s) for s in symptoms if s.strip()]
+    if not normalized:
+        return []
+    for mode in db._match_modes():
+        rows = await _fetchall(*db._multi_symptom_query(normalized, mode, RESULT_TOP_K))
+        if rows:
+            return _dedup_rows(list(rows))
+    return []
+
+
+async def get_vaccine_schedule(language="en"):
+    if language == "en":
+        return VACCINE_SCHEDULE
+    try:
+        return await translate_async(VACCINE_SCHEDULE, source="en", target=language)
+    except Exception as e:
+        print("Translation failed:", e)
+        return VACCINE_SCHEDULE
+
+
+async def handle_message(from_number, incoming_msg):
+    """
+    Async twin of bot.handle_message: the name lookup and symptom fallback run concurrently,
+    each on its own worker thread (index backend) or pooled connection (db backend). Session
+    store, intent matcher and catalog calls can block (MySQL, translation), so they also run
+    on worker threads instead of the event loop.
+    """
+    session = await asyncio.to_thread(get_session, from_number)
+    intent = await asyncio.to_thread(intents.classify, incoming_msg)
+    language = session["language"]
+    reply = await asyncio.to_thread(select_language, session, incoming_msg, intent)
+    if session["language"] != language:
+        await asyncio.to_thread(save_session, from_number, session)
+    elif language:
+        await asyncio.to_thread(touch_session, from_number, session)
+    if reply is not None:
+        return reply
+
+    lang = session["language"]
+    cache_key = await asyncio.to_thread(replycache.key, incoming_msg, lang)
+    reply = replycache.get(cache_key, incoming_msg)
+    if reply is None:
+        reply, miss_key = await answer_query(lang, incoming_msg, intent)
+        replycache.put(cache_key, reply, miss_key)
+    return reply
+
+
+async def answer_query(lang, incoming_msg, intent):
+    user_query = intent.query or incoming_msg
+    if lang != "en" and not intent.query:
+        user_query = await translate_async(user_query, source="auto", target="en")
+
+    if is_vaccine_query(user_query):
+        return await get_vaccine_schedule(lang), None
+
+    if "," in user_query:
+        diseases = await get_diseases_by_multiple_symptoms(split_symptoms(user_query))
+        return await asyncio.to_thread(render_lookup, lang, incoming_msg, diseases=diseases, multi=True)
+
+    info, diseases = await asyncio.gather(
+        get_disease_info(user_query),
+        get_diseases_by_multiple_symptoms([user_query]),
+    )
+    return await asyncio.to_thread(render_lookup, lang, incoming_msg, info=info, diseases=diseases)
+
+
+async def _read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def _respond(send, status, body, content_type="text/html; charset=utf-8"):
+    payload = body.encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", content_type.encode("latin-1")),
+            (b"content-length", str(len(payload)).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # same modes as bot.create_app; warm-up builds the index and catalog off the loop
+            if WARMUP_MODE == "blocking":
+                await asyncio.to_thread(warm_up)
+            elif WARMUP_MODE == "background":
+                _background.append(asyncio.create_task(asyncio.to_thread(warm_up)))
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if _pool is not None:
+                _pool.close()
+                await _pool.wait_closed()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def webhook(scope, receive):
+    # Same precedence as Flask's request.values: query string wins over the form body
+    values = {}
+    if scope["method"] == "POST":
+        values.update(parse_qsl((await _read_body(receive)).decode("utf-8")))
+    values.update(parse_qsl(scope.get("query_string", b"").decode("utf-8")))
+
+    resp = MessagingResponse()
+    # never block the event loop waiting on a retry's first delivery
+    sid = values.get("MessageSid", "")
+    replay = admission.claim(sid, wait=0)
+    if replay is not None:
+        return str(resp) if replay is admission.IN_PROGRESS else replay
+    try:
+        body = await _webhook_body(values, resp)
+    except Exception:
+        admission.release(sid)
+        raise
+    admission.complete(sid, body)
+    return body
+
+
+async def _webhook_body(values, resp):
+    incoming_msg = values.get("Body", "").strip().lower()
+    from_number = values.get("From", "")
+    print("Incoming message:", incoming_msg, "From:", from_number)
+
+    if not admission.allow_sender(from_number):
+        resp.message(THROTTLED_REPLY)
+    elif not admission.enter():
+        resp.message(BUSY_REPLY)
+    else:
+        try:
+            resp.message(await handle_message(from_number, incoming_msg))
+        finally:
+            admission.leave()
+    return str(resp)
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    path, method = scope["path"], scope["method"]
+    if path == "/" and method == "GET":
+        await _respond(send, 200, "Server is running!")
+    elif path == "/webhook" and method in ("GET", "POST"):
+        try:
+            twiml = await webhook(scope, receive)
+        except Exception as e:
+            print("Error reading request:", e)
+            await _respond(send, 500, "Error")
+            return
+        await _respond(send, 200, twiml, "application/xml")
+    else:
+        await _respond(send, 404, "Not Found")
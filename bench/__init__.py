@@ -0,0 +1,2 @@
+# bench/__init__.py
+# Benchmarks: run from the repository root, e.g. `python -m bench.run --help`.
@@ -0,0 +1,44 @@
+# bench/coldstart.py
+import sys
+import json
+import subprocess
+
+# Runs in a fresh interpreter so nothing is already imported or cached
+_PROBE = """
+import json, time
+t0 = time.perf_counter()
+import bot
+t1 = time.perf_counter()
+app = bot.create_app(warmup={warmup!r})
+t2 = time.perf_counter()
+client = app.test_client()
+client.get("/")
+t3 = time.perf_counter()
+while client.get("/ready").status_code != 200 and time.perf_counter() - t3 < 60:
+    time.sleep(0.01)
+t4 = time.perf_counter()
+print(json.dumps({{
+    "import_ms": round((t1 - t0) * 1000, 1),
+    "create_app_ms": round((t2 - t1) * 1000, 1),
+    "first_response_ms": round((t3 - t0) * 1000, 1),
+    "ready_ms": round((t4 - t0) * 1000, 1),
+}}))
+"""
+
+
+def measure(warmup="background", runs=3):
+    """
+    Import time, create_app time, time to the first response and time until /ready returns 200,
+    each measured from a new process; returns the best of `runs` for every figure.
+    """
+    results = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _PROBE.format(warmup=warmup)],
+                             capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {key: min(r[key] for r in results) for key in results[0]}
+
+
+if __name__ == "__main__":
+    for mode in ("off", "background", "blocking"):
+        print(mode, measure(mode))
@@ -0,0 +1,76 @@
+# bench/dataset.py
+import os
+import json
+import random
+import itertools
+import tempfile
+
+# Syllables for pronounceable, collision-resistant synthetic names
+_SYLLABLES = ["ka", "lo", "mi", "ra", "te", "su", "no", "vi", "de", "po", "ga", "ri", "zu", "he", "ba", "ol"]
+_BODY = ["head", "chest", "joint", "skin", "eye", "throat", "stomach", "back", "muscle", "ear"]
+_KIND = ["pain", "rash", "swelling", "itching", "burning", "weakness", "stiffness", "bleeding"]
+
+
+def _name(rng, used, parts):
+    """A fresh random name; grows by a syllable whenever it collides, so it always terminates."""
+    while True:
+        name = "".join(rng.choice(_SYLLABLES) for _ in range(parts))
+        if name not in used:
+            used.add(name)
+            return name
+        parts += 1
+
+
+def generate_dataset(n_diseases=2000, n_symptoms=5000, symptoms_per_disease=6, seed=42):
+    """
+    A dataset in the loader.read_dataset JSON shape: n_diseases diseases drawing from a pool
+    of n_symptoms symptom phrases (skewed so some symptoms are common, like real data),
+    plus a few aliases and symptom variants. Same seed -> same dataset.
+    """
+    rng = random.Random(seed)
+    used = set()
+    combos = [f"{body} {kind}" for body in _BODY for kind in _KIND]
+    rng.shuffle(combos)
+    symptoms = combos[:n_symptoms]
+    while len(symptoms) < n_symptoms:
+        symptoms.append(f"{_name(rng, used, 3)} {rng.choice(combos)}")
+
+    diseases = {}
+    cum_weights = list(itertools.accumulate(1.0 / (i + 1) for i in range(n_symptoms)))
+    for _ in range(n_diseases):
+        name = _name(rng, used, 4)
+        picked = set()
+        while len(picked) < min(symptoms_per_disease, n_symptoms):
+            picked.add(rng.choices(symptoms, cum_weights=cum_weights)[0])
+        diseases[name] = {
+            "symptoms": sorted(picked),
+            "preventions": [f"Prevention step {j + 1} for {name}" for j in range(3)],
+            "cases": rng.randint(0, 500),
+        }
+
+    names = list(diseases)
+    aliases = {name: [name + " fever"] for name in rng.sample(names, min(len(names), n_diseases // 10))}
+    variants = {s: [s.replace(" ", "-")] for s in rng.sample(symptoms, min(len(symptoms), n_symptoms // 10))}
+    return {"diseases": diseases, "aliases": aliases, "symptom_variants": variants}
+
+
+def write_dataset(dataset, path=None):
+    """Write `dataset` as JSON (to a temp file unless `path` is given) and return the path."""
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="bench-dataset-", suffix=".json")
+        os.close(fd)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dataset, f)
+    return path
+
+
+def seed(n_diseases=2000, n_symptoms=5000, symptoms_per_disease=6, seed=42):
+    """Reseed the configured MySQL database with a synthetic dataset; returns the dataset."""
+    from db import seed_database
+    dataset = generate_dataset(n_diseases, n_symptoms, symptoms_per_disease, seed)
+    path = write_dataset(dataset)
+    try:
+        seed_database(path)
+    finally:
+        os.remove(path)
+    return dataset
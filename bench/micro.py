@@ -0,0 +1,53 @@
+# bench/micro.py
+import time
+import random
+from bench.stats import summarize
+
+
+def _time_calls(name, func, args_list):
+    latencies = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        latencies.append(time.perf_counter() - start)
+    return summarize(name, latencies)
+
+
+def run_pure(dataset, iterations=20000, seed=7):
+    """normalize_word (cold and cached) and _dedup_symptoms; no database needed."""
+    import db
+    rng = random.Random(seed)
+    symptoms = sorted({s for d in dataset["diseases"].values() for s in d["symptoms"]})
+    words = [rng.choice(symptoms).upper() + "  " for _ in range(iterations)]
+    joined = [",".join(rng.sample(symptoms, 6) * 2) for _ in range(iterations // 10)]
+
+    results = []
+    db.normalize_word.cache_clear()
+    results.append(_time_calls("normalize_word (cold)", db.normalize_word, [(w,) for w in words]))
+    results.append(_time_calls("normalize_word (cached)", db.normalize_word, [(w,) for w in words]))
+    results.append(_time_calls("_dedup_symptoms", db._dedup_symptoms, [(j,) for j in joined]))
+    return results
+
+
+def run_db(dataset, iterations=500, seed=7):
+    """Each repository query helper against the seeded MySQL instance."""
+    import repository
+    import datetime
+    rng = random.Random(seed)
+    diseases = list(dataset["diseases"])
+    symptoms = sorted({s for d in dataset["diseases"].values() for s in d["symptoms"]})
+    today = datetime.date.today()
+
+    results = [
+        _time_calls("repository.get_disease_info", repository.get_disease_info,
+                    [(rng.choice(diseases),) for _ in range(iterations)]),
+        _time_calls("repository.get_disease_by_symptom", repository.get_disease_by_symptom,
+                    [(rng.choice(symptoms),) for _ in range(iterations)]),
+        _time_calls("repository.get_diseases_by_multiple_symptoms", repository.get_diseases_by_multiple_symptoms,
+                    [(rng.sample(symptoms, 3),) for _ in range(iterations)]),
+        _time_calls("repository.get_today_alert", repository.get_today_alert,
+                    [(rng.choice(diseases), today) for _ in range(iterations)]),
+        _time_calls("repository.get_all_diseases", repository.get_all_diseases,
+                    [() for _ in range(max(1, iterations // 50))]),
+    ]
+    return results
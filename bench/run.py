@@ -0,0 +1,72 @@
+# bench/run.py
+"""
+Benchmark suite. Needs a local MySQL configured through the usual MYSQL_* variables;
+the database is reseeded with a synthetic dataset, so never point it at real data.
+
+    python -m bench.run                              # everything at the default scale
+    python -m bench.run --only micro --no-seed       # pure-Python micro-benchmarks only
+    python -m bench.run --diseases 10000 --concurrency 64 --mix en=0.5,hi=0.5
+    python -m bench.run --url http://127.0.0.1:5000/webhook   # against a running server
+                                                              # (started with SENDER_RATE=0)
+    python -m bench.run --only coldstart                      # import / first-response timings
+"""
+import sys
+import json
+import argparse
+from bench import dataset as bench_dataset
+from bench import micro, webhook, coldstart
+from bench.stats import print_table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Webhook load test and db micro-benchmarks")
+    parser.add_argument("--only", choices=["micro", "db", "webhook", "coldstart"], action="append")
+    parser.add_argument("--diseases", type=int, default=2000)
+    parser.add_argument("--symptoms", type=int, default=5000)
+    parser.add_argument("--per-disease", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-seed", action="store_true", help="reuse the data already in MySQL")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default="en=0.6,hi=0.3,or=0.1")
+    parser.add_argument("--translate-delay", type=float, default=0.0, help="fake translator latency (s)")
+    parser.add_argument("--url", help="post to a running server instead of the in-process app")
+    parser.add_argument("--json", action="store_true", help="print results as JSON lines")
+    args = parser.parse_args(argv)
+    suites = args.only or ["micro", "db", "webhook"]
+
+    if "coldstart" in suites:
+        for mode in ("off", "background", "blocking"):
+            print(f"cold start, warmup={mode}:", json.dumps(coldstart.measure(mode)))
+        suites = [s for s in suites if s != "coldstart"]
+        if not suites:
+            return 0
+
+    if args.no_seed or suites == ["micro"]:
+        data = bench_dataset.generate_dataset(args.diseases, args.symptoms, args.per_disease, args.seed)
+    else:
+        print(f"Seeding {args.diseases} diseases / {args.symptoms} symptoms...")
+        data = bench_dataset.seed(args.diseases, args.symptoms, args.per_disease, args.seed)
+
+    results = []
+    if "micro" in suites:
+        results += micro.run_pure(data)
+    if "db" in suites:
+        results += micro.run_db(data)
+    if "webhook" in suites:
+        results.append(webhook.run(data, requests=args.requests, concurrency=args.concurrency, mix=args.mix,
+                                   url=args.url, translate_delay=args.translate_delay))
+
+    if args.json:
+        for row in results:
+            print(json.dumps(row))
+    else:
+        print_table(results)
+        for row in results:
+            if row.get("errors"):
+                print(f"{row['name']}: {row['errors']} non-200 responses")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+# bench/stats.py
+import math
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(name, latencies, elapsed=None):
+    """{"name", "n", "p50_ms", "p95_ms", "p99_ms", "max_ms", "rps"} from per-call latencies in seconds."""
+    values = sorted(latencies)
+    total = elapsed if elapsed is not None else sum(values)
+    return {
+        "name": name,
+        "n": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+        "rps": round(len(values) / total, 1) if total else 0.0,
+    }
+
+
+def print_table(rows):
+    columns = ("name", "n", "p50_ms", "p95_ms", "p99_ms", "max_ms", "rps")
+    width = max([len(r["name"]) for r in rows] + [4])
+    print(f"{'name':<{width}}  " + "  ".join(f"{c:>9}" for c in columns[1:]))
+    for r in rows:
+        print(f"{r['name']:<{width}}  " + "  ".join(f"{r[c]:>9}" for c in columns[1:]))
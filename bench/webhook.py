@@ -0,0 +1,140 @@
+# bench/webhook.py
+import os
+import time
+import random
+import threading
+from bench.stats import summarize
+
+
+class EchoTranslator:
+    """Local translation stub: English passes through, other targets are tagged; optional fake latency."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def translate(self, text, source, target):
+        if self.delay:
+            time.sleep(self.delay)
+        return text if target == "en" else f"[{target}] {text}"
+
+
+# what a sender replies to pick a language (see intents "language:<code>")
+LANGUAGE_WORDS = {"en": "english", "hi": "hindi", "or": "odia"}
+
+
+def parse_mix(spec):
+    """"en=0.6,hi=0.3,or=0.1" -> {"en": 0.6, "hi": 0.3, "or": 0.1}"""
+    mix = {}
+    for part in spec.split(","):
+        lang, _, weight = part.partition("=")
+        mix[lang.strip()] = float(weight or 1)
+    return mix
+
+
+def make_messages(dataset, n, seed=7):
+    """Twilio-ish message bodies: disease names, aliases, single symptoms, symptom lists and typos."""
+    rng = random.Random(seed)
+    diseases = list(dataset["diseases"])
+    symptoms = sorted({s for d in dataset["diseases"].values() for s in d["symptoms"]})
+    aliases = [a for names in dataset.get("aliases", {}).values() for a in names]
+    kinds = ["disease", "symptom", "symptoms", "typo", "alias", "vaccine"]
+    weights = [30, 25, 25, 10, 5, 5]
+    messages = []
+    for _ in range(n):
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "disease":
+            messages.append(rng.choice(diseases))
+        elif kind == "symptom":
+            messages.append(rng.choice(symptoms))
+        elif kind == "symptoms":
+            messages.append(", ".join(rng.sample(symptoms, rng.randint(2, 4))))
+        elif kind == "typo":
+            word = rng.choice(diseases)
+            i = rng.randrange(len(word))
+            messages.append(word[:i] + word[i + 1:])
+        elif kind == "alias" and aliases:
+            messages.append(rng.choice(aliases))
+        else:
+            messages.append("vaccine schedule")
+    return messages
+
+
+def run(dataset, requests=2000, concurrency=16, mix="en=0.6,hi=0.3,or=0.1", users=500, url=None,
+        translate_delay=0.0, seed=7):
+    """
+    Send `requests` form posts to /webhook from `concurrency` threads, spread over `users` senders
+    whose language is drawn from `mix`. Without `url` the Flask app is driven in-process with the
+    translator and Twilio client replaced by local stubs. With `url`, every sender first picks
+    its language over HTTP (untimed); start that server with SENDER_RATE=0, or the per-sender
+    throttle answers most timed requests. Returns a bench.stats summary dict.
+    """
+    rng = random.Random(seed)
+    languages = parse_mix(mix)
+    senders = [f"whatsapp:+9100000{i:05d}" for i in range(users)]
+    choices = {sender: rng.choices(list(languages), list(languages.values()))[0] for sender in senders}
+    messages = make_messages(dataset, requests, seed)
+    # fresh MessageSids every run: the server answers a SID it has seen with its stored reply
+    run_id = os.urandom(4).hex()
+
+    if url:
+        import httpx
+        with httpx.Client(timeout=30) as http:
+            for sender, language in choices.items():
+                # no MessageSid, so the choice is processed even if an earlier run sent the same one
+                http.post(url, data={"From": sender, "Body": LANGUAGE_WORDS[language],
+                                     "To": "whatsapp:+10000000000"}).raise_for_status()
+    else:
+        import bot
+        import admission
+        import translation
+        from broadcast import FakeTwilioClient
+
+        translation.set_backend(EchoTranslator(translate_delay))
+        bot.client = FakeTwilioClient()
+        admission.SENDER_RATE = 0  # measure the bot, not the per-sender throttle
+        app = bot.create_app(warmup="blocking")
+        for sender, language in choices.items():
+            bot.save_session(sender, {"language": language})
+
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    cursor = iter(range(requests))
+
+    def worker():
+        if url:
+            import httpx
+            http = httpx.Client(timeout=30)
+            post = lambda form: http.post(url, data=form)
+        else:
+            client = app.test_client()
+            post = lambda form: client.post("/webhook", data=form)
+        local = []
+        failed = 0
+        while True:
+            with lock:
+                i = next(cursor, None)
+            if i is None:
+                break
+            form = {"From": senders[i % len(senders)], "Body": messages[i], "To": "whatsapp:+10000000000",
+                    "MessageSid": f"SM{run_id}{i:024d}"}
+            start = time.perf_counter()
+            response = post(form)
+            local.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    result = summarize(f"webhook c={concurrency}", latencies, elapsed)
+    result["errors"] = errors[0]
+    return result
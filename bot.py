@@ -1,10 +1,29 @@
-from flask import Flask, request
-from twilio.twiml.messaging_response import MessagingResponse
-from twilio.rest import Client
+from flask import Blueprint, Flask, request
+import hmac
+import time
 import random
 import datetime
-from deep_translator import GoogleTranslator
-import mysql.connector
+import threading
+import translation
+from translation import translate, prewarm
+import db
+import repository
+from knowledge import get_index
+import catalog
+import sessions
+import broadcast
+import cases
+import ingest
+import metrics
+import replycache
+import intents
+import snapshot
+import admission
+from pipeline import Pipeline, InProcessQueue
+from config import (
+    WEBHOOK_MODE, PIPELINE_WORKERS, PIPELINE_QUEUE_SIZE, LOOKUP_BACKEND, RESULT_TOP_K, PROFILER_ENABLED,
+    WARMUP_MODE, INGEST_TOKEN,
+)
 
 
 ACCOUNT_SID = ""
@@ -12,103 +31,77 @@ AUTH_TOKEN = ""
 TWILIO_WHATSAPP = ""  
 USER_WHATSAPP = ""   
 
-# MySQL credentials
-db_config = {
-    "host": "",
-    "user": "",
-    "password": "",
-    "database": ""
-}
+BUSY_REPLY = "We are receiving a lot of messages right now. Please try again in a minute."
+THROTTLED_REPLY = "You are sending messages too quickly. Please wait a moment and try again."
+
+
+session_store = sessions.get_store()
+
+# Twilio client, created on first use (see get_client) so importing this module stays cheap
+client = None
+_client_lock = threading.Lock()
+
+# Routes live on a blueprint; create_app() builds the Flask app around it
+routes = Blueprint("bot", __name__)
 
+# Warm-up state reported by /ready
+_ready = threading.Event()
+_warmup = {"started": None, "seconds": None, "error": None}
 
-user_sessions = {}
 
-# Init Twilio client
-client = Client(ACCOUNT_SID, AUTH_TOKEN)
+def get_client():
+    global client
+    if client is None:
+        with _client_lock:
+            if client is None:
+                from twilio.rest import Client
+                client = Client(ACCOUNT_SID, AUTH_TOKEN)
+    return client
 
-# Init Flask app
-app = Flask(__name__)
+
+def messaging_response():
+    # twilio's TwiML module is only needed once a message arrives
+    from twilio.twiml.messaging_response import MessagingResponse
+    return MessagingResponse()
 
 
 def get_random_disease():
-    conn = mysql.connector.connect(**db_config)
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT d.disease_name, c.num_cases
-        FROM cases c
-        JOIN diseases d ON c.disease_id = d.disease_id
-        WHERE c.case_date = CURDATE()
-    """)
-    results = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    if results:
-        return random.choice(results)
+    """(disease_name, cases) for a random disease reported today, from the daily snapshot."""
+    diseases = cases.daily_snapshot()["diseases"]
+    if diseases:
+        picked = random.choice(diseases)
+        return picked["disease"], picked["cases"]
     return None
 
 def get_disease_info(disease_name):
-    conn = mysql.connector.connect(**db_config)
-    cursor = conn.cursor(dictionary=True)
-    query = """
-    SELECT d.disease_name AS disease,
-           GROUP_CONCAT(DISTINCT s.symptom_name) AS symptoms,
-           GROUP_CONCAT(DISTINCT p.prevention_text) AS prevention
-    FROM diseases d
-    LEFT JOIN disease_symptoms ds ON d.disease_id = ds.disease_id
-    LEFT JOIN symptoms s ON ds.symptom_id = s.symptom_id
-    LEFT JOIN preventions p ON d.disease_id = p.disease_id
-    WHERE LOWER(d.disease_name) LIKE %s
-    GROUP BY d.disease_id
-    """
-    cursor.execute(query, ("%" + disease_name.lower() + "%",))
-    result = cursor.fetchone()
-    cursor.close()
-    conn.close()
-    return result
+    if LOOKUP_BACKEND == "db":
+        return repository.get_disease_info(disease_name)
+    return get_index().disease_info(disease_name)
 
 def get_diseases_by_multiple_symptoms(symptoms):
-    conn = mysql.connector.connect(**db_config)
-    cursor = conn.cursor(dictionary=True)
-    like_clauses = " OR ".join(["LOWER(s.symptom_name) LIKE %s" for _ in symptoms])
-    query = f"""
-    SELECT d.disease_name AS disease,
-           GROUP_CONCAT(DISTINCT s.symptom_name) AS symptoms,
-           GROUP_CONCAT(DISTINCT p.prevention_text) AS prevention,
-           COUNT(DISTINCT s.symptom_id) AS matched_symptoms
-    FROM diseases d
-    JOIN disease_symptoms ds ON d.disease_id = ds.disease_id
-    JOIN symptoms s ON ds.symptom_id = s.symptom_id
-    LEFT JOIN preventions p ON d.disease_id = p.disease_id
-    WHERE {like_clauses}
-    GROUP BY d.disease_id
-    HAVING matched_symptoms >= 1
-    ORDER BY matched_symptoms DESC
-    """
-    values = [f"%{s.strip().lower()}%" for s in symptoms if s.strip()]
-    cursor.execute(query, values)
-    results = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return results
+    if LOOKUP_BACKEND == "db":
+        return repository.get_diseases_by_multiple_symptoms(symptoms, limit=RESULT_TOP_K)
+    return get_index().ranked_diseases(symptoms, RESULT_TOP_K)
 
 def send_startup_alert():
+    """Broadcast today's alert to every subscriber (resumes if today's run was interrupted)."""
     disease = get_random_disease()
-    if disease:
-        disease_name, num_cases = disease
-        alert_msg = f"Disease Alert: Today {disease_name} has {num_cases} reported cases.\n\nChoose your language: Hindi, Odia, English"
-    else:
-        alert_msg = "No disease data found for today."
-
-    client.messages.create(
-        from_=TWILIO_WHATSAPP,
-        to=USER_WHATSAPP,
-        body=alert_msg
+    if not disease:
+        print("No disease data found for today.")
+        return
+    disease_name, num_cases = disease
+    if USER_WHATSAPP:
+        broadcast.add_subscriber(USER_WHATSAPP)
+    broadcast_id = f"daily-alert-{datetime.date.today().isoformat()}"
+    broadcast.broadcast(
+        broadcast_id,
+        broadcast.render_alert(disease_name, num_cases),
+        broadcast.twilio_sender(get_client(), TWILIO_WHATSAPP)
     )
     print("Startup alert sent!")
 
 
-def get_vaccine_schedule(language="en"):
-    schedule = """
+VACCINE_SCHEDULE = """
 💉 *Complete Vaccine Schedule (India)*
 
 👶 **At Birth**
@@ -162,97 +155,399 @@ def get_vaccine_schedule(language="en"):
 - Typhoid booster
     """
 
+def get_vaccine_schedule(language="en"):
+    schedule = VACCINE_SCHEDULE
+
     # Translate if language is not English
     if language != "en":
         try:
-            schedule = GoogleTranslator(source='en', target=language).translate(schedule)
+            schedule = translate(schedule, source="en", target=language)
         except Exception as e:
             print("Translation failed:", e)
 
     return schedule
 
-@app.route("/webhook", methods=["GET","POST"])
-def webhook():
-    
-    resp = MessagingResponse()
-    try:
-        incoming_msg = request.values.get("Body", "").strip().lower()
-        from_number = request.values.get("From", "")
-        print("Incoming message:", incoming_msg, "From:", from_number)
-
-        reply = ""
-
-        if from_number not in user_sessions:
-            user_sessions[from_number] = {"language": None}
-        session = user_sessions[from_number]
-
-        # STEP 1: Language selection
-        if not session["language"]:
-            if "english" in incoming_msg:
-                session["language"] = "en"
-                reply = "You selected English. "
-            elif "hindi" in incoming_msg or "हिंदी" in incoming_msg:
-                session["language"] = "hi"
-                reply = "आपने हिंदी चुना है। "
-            elif "odia" in incoming_msg or "ଓଡ଼ିଆ" in incoming_msg:
-                session["language"] = "or"
-                reply = "ଆପଣ ଓଡ଼ିଆ ବାଛିଛନ୍ତି "
-            else:
-                reply = "Please reply with Hindi(हिन्दी), Odia(ହିନ୍ଦୀ), or English."
-            resp.message(reply)
-            return str(resp)
 
-        # STEP 2: Process queries
-        lang = session["language"]
-        user_query = incoming_msg
+def prewarm_translations():
+    """Translate the vaccine schedule and build the reply catalog for every supported language."""
+    prewarm([VACCINE_SCHEDULE], languages=catalog.SUPPORTED_LANGUAGES)
+    catalog.rebuild()
 
-        if lang != "en":
-            user_query = GoogleTranslator(source="auto", target="en").translate(user_query)
 
-        # Vaccine Schedule
-        if "vaccine" in user_query.lower() and "schedule" in user_query.lower():
-            msg = get_vaccine_schedule(lang)
-            resp.message(msg)
-            return str(resp)
+def format_disease_list(diseases, lang):
+    """Assemble a "Possible diseases" reply from pre-localized pieces."""
+    msg = catalog.render("possible_diseases", lang) + "\n"
+    for d in diseases:
+        msg += catalog.render(
+            "disease_line", lang,
+            catalog.term(d["disease"], lang),
+            catalog.terms(d["symptoms"], lang, sep=", "),
+            catalog.terms(d["prevention"], lang)
+        ) + "\n"
+    return msg
+
+
+def format_disease_info(info, lang):
+    return catalog.render(
+        "disease_info", lang,
+        catalog.term(info["disease"], lang),
+        catalog.terms(info["symptoms"], lang, sep=", "),
+        catalog.terms(info["prevention"], lang)
+    )
+
+
+def get_session(from_number):
+    session = session_store.get(from_number)
+    if session is None:
+        session = {"language": None}
+    return session
+
+
+def save_session(from_number, session):
+    session_store.set(from_number, session)
+
+
+def touch_session(from_number, session):
+    session_store.touch(from_number, session)
+
+
+LANGUAGE_SELECTED = {
+    "en": "You selected English. ",
+    "hi": "आपने हिंदी चुना है। ",
+    "or": "ଆପଣ ଓଡ଼ିଆ ବାଛିଛନ୍ତି ",
+}
+LANGUAGE_CHOICES = "Please reply with Hindi(हिन्दी), Odia(ଓଡ଼ିଆ), or English."
+
+
+def select_language(session, incoming_msg, intent=None):
+    """
+    STEP 1: returns the reply while no language is chosen yet, else None.
+    Mid-session, "change language" (optionally naming one) or a bare language name switches.
+    """
+    intent = intent or intents.classify(incoming_msg)
+    if intent.kind == "change_language":
+        session["language"] = intent.language
+        return LANGUAGE_SELECTED[intent.language] if intent.language else LANGUAGE_CHOICES
+    if session["language"]:
+        if intent.kind == "language" and intent.whole:
+            session["language"] = intent.language
+            return LANGUAGE_SELECTED[intent.language]
+        return None
+    if intent.kind == "language":
+        session["language"] = intent.language
+        return LANGUAGE_SELECTED[intent.language]
+    return LANGUAGE_CHOICES
+
+
+def is_vaccine_query(user_query):
+    q = user_query.lower()
+    return "vaccine" in q and "schedule" in q
+
+
+def split_symptoms(user_query):
+    return [s.strip() for s in user_query.split(",")]
+
+
+def render_lookup(lang, incoming_msg, info=None, diseases=None, multi=False):
+    """Turn lookup results into (reply text, catalog key of the "nothing found" reply or None)."""
+    if info:
+        return format_disease_info(info, lang), None
+    if diseases:
+        return format_disease_list(diseases, lang), None
+    if multi:
+        return catalog.render("no_symptom_match", lang), "no_symptom_match"
+    return catalog.render("no_data", lang, incoming_msg), "no_data"
+
+
+def answer_query(lang, incoming_msg, intent=None):
+    """
+    Reply for a query from a sender whose language is set, as (text, miss_key) like render_lookup.
+    Messages the intent router resolved (keywords, known names in any script) skip inbound translation.
+    """
+    intent = intent or intents.classify(incoming_msg)
+    user_query = intent.query or incoming_msg
+
+    if lang != "en" and not intent.query:
+        with metrics.span("translate_in"):
+            user_query = translate(user_query, source="auto", target="en")
+
+    if is_vaccine_query(user_query):
+        with metrics.span("translate_out"):
+            return get_vaccine_schedule(lang), None
+
+    if "," in user_query:
+        with metrics.span("lookup"):
+            diseases = get_diseases_by_multiple_symptoms(split_symptoms(user_query))
+        with metrics.span("translate_out"):
+            return render_lookup(lang, incoming_msg, diseases=diseases, multi=True)
+
+    with metrics.span("lookup"):
+        info = get_disease_info(user_query)
+    if info:
+        with metrics.span("translate_out"):
+            return render_lookup(lang, incoming_msg, info=info)
+    with metrics.span("fallback_lookup"):
+        diseases = get_diseases_by_multiple_symptoms([user_query])
+    with metrics.span("translate_out"):
+        return render_lookup(lang, incoming_msg, diseases=diseases)
+
+
+def handle_message(from_number, incoming_msg):
+    """Compute the reply text for one inbound message (updates the sender's session)."""
+    with metrics.span("session"):
+        session = get_session(from_number)
+    with metrics.span("intent"):
+        intent = intents.classify(incoming_msg)
+    language = session["language"]
+    reply = select_language(session, incoming_msg, intent)
+    if session["language"] != language:
+        save_session(from_number, session)
+    elif language:
+        touch_session(from_number, session)
+    if reply is not None:
+        return reply
+
+    # STEP 2: Process queries (popular questions are answered straight from the reply cache)
+    lang = session["language"]
+    cache_key = replycache.key(incoming_msg, lang)
+    reply = replycache.get(cache_key, incoming_msg)
+    if reply is not None:
+        metrics.inc("reply_cache_total", result="hit")
+        return reply
+    metrics.inc("reply_cache_total", result="miss")
+
+    reply, miss_key = answer_query(lang, incoming_msg, intent)
+    replycache.put(cache_key, reply, miss_key)
+    return reply
+
+
+def send_reply(to_number, body):
+    get_client().messages.create(
+        from_=TWILIO_WHATSAPP,
+        to=to_number,
+        body=body
+    )
 
-        if "," in user_query:
-            symptoms = [s.strip() for s in user_query.split(",")]
-            diseases = get_diseases_by_multiple_symptoms(symptoms)
-            if diseases:
-                msg = "Possible diseases:\n"
-                for d in diseases:
-                    msg += f"- {d['disease']}: Symptoms [{d['symptoms']}], Prevention [{d['prevention']}]\n"
-            else:
-                msg = "No diseases found matching those symptoms."
+
+pipeline = Pipeline(
+    InProcessQueue(workers=PIPELINE_WORKERS, maxsize=PIPELINE_QUEUE_SIZE),
+    handle_message,
+    send_reply
+)
+
+
+@routes.route("/webhook", methods=["GET","POST"])
+def webhook():
+    
+    resp = messaging_response()
+    with metrics.span("webhook"):
+        # Twilio retries slow deliveries with the same MessageSid: answer those from the store
+        sid = request.values.get("MessageSid", "")
+        replay = admission.claim(sid)
+        if replay is not None:
+            metrics.inc("webhook_requests_total", outcome="replayed")
+            return str(resp) if replay is admission.IN_PROGRESS else replay
+        try:
+            body = _webhook_body(resp)
+        except Exception as e:
+            admission.release(sid)
+            metrics.inc("webhook_requests_total", outcome="error")
+            print("Error reading request:", e)
+            return "Error", 500
+        admission.complete(sid, body)
+        return body
+
+
+def _webhook_body(resp):
+    incoming_msg = request.values.get("Body", "").strip().lower()
+    from_number = request.values.get("From", "")
+    print("Incoming message:", incoming_msg, "From:", from_number)
+
+    if not admission.allow_sender(from_number):
+        metrics.inc("webhook_requests_total", outcome="throttled")
+        resp.message(THROTTLED_REPLY)
+        return str(resp)
+
+    if WEBHOOK_MODE == "async":
+        # Acknowledge right away; the reply goes out through the REST API
+        if not from_number:
+            return str(resp)
+        if not pipeline.submit(from_number, incoming_msg):
+            metrics.inc("webhook_requests_total", outcome="busy")
+            resp.message(BUSY_REPLY)
         else:
-            info = get_disease_info(user_query)
-            if info:
-                msg = f"ℹ{info['disease']}\nSymptoms: {info['symptoms']}\nPrevention: {info['prevention']}"
-            else:
-                diseases = get_diseases_by_multiple_symptoms([user_query])
-                if diseases:
-                    msg = "Possible diseases:\n"
-                    for d in diseases:
-                        msg += f"- {d['disease']}: Symptoms [{d['symptoms']}], Prevention [{d['prevention']}]\n"
-                else:
-                    msg = f"No data found for '{incoming_msg}'."
-
-        if lang != "en":
-            target = "hi" if lang == "hi" else "or"
-            msg = GoogleTranslator(source="en", target=target).translate(msg)
-
-        resp.message(msg)
+            metrics.inc("webhook_requests_total", outcome="queued")
         return str(resp)
 
-    except Exception as e:
-        print("Error reading request:", e)
-        return "Error", 500
+    if not admission.enter():
+        metrics.inc("webhook_requests_total", outcome="shed")
+        resp.message(BUSY_REPLY)
+        return str(resp)
+    try:
+        reply = handle_message(from_number, incoming_msg)
+    finally:
+        admission.leave()
+    with metrics.span("twiml"):
+        resp.message(reply)
+        body = str(resp)
+    metrics.inc("webhook_requests_total", outcome="ok")
+    return body
+
+
+def _runtime_gauges():
+    """Pool, cache, session and pipeline counters as gauges for /metrics."""
+    gauges = []
+    sources = {
+        "db_pool": db.pool_stats(),
+        "translation": translation.stats(),
+        "sessions": session_store.stats(),
+        "pipeline": pipeline.stats(),
+        "reply_cache": replycache.stats(),
+        "knowledge_snapshot": snapshot.stats(),
+        "admission": admission.stats(),
+    }
+    for source, stats in sources.items():
+        for key, value in stats.items():
+            if isinstance(value, dict):
+                for sub, sub_value in value.items():
+                    if isinstance(sub_value, (int, float)):
+                        gauges.append((f"{source}_{key}_{sub}", {}, sub_value))
+            elif isinstance(value, (int, float)):
+                gauges.append((f"{source}_{key}", {}, value))
+    return gauges
+
+
+metrics.register_collector(_runtime_gauges)
+
+
+@routes.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    return metrics.render(), 200, {"Content-Type": "text/plain; version=0.0.4"}
+
+
+@routes.route("/debug/profile", methods=["GET", "POST"])
+def profile():
+    """
+    Sampling profiler switch (only when PROFILER_ENABLED):
+    POST ?action=start|stop|clear, GET returns collapsed stacks (?top=N).
+    """
+    if not PROFILER_ENABLED:
+        return "Not found", 404
+    if request.method == "POST":
+        action = request.args.get("action", "")
+        if action == "start":
+            metrics.profiler.start()
+        elif action == "stop":
+            metrics.profiler.stop()
+        elif action == "clear":
+            metrics.profiler.clear()
+        else:
+            return "Unknown action", 400
+        return {"running": metrics.profiler.running, "stacks": len(metrics.profiler.samples)}
+    top = request.args.get("top", type=int)
+    return metrics.profiler.report(top), 200, {"Content-Type": "text/plain"}
+
+
+def _ingest_authorized():
+    expected = f"Bearer {INGEST_TOKEN}"
+    return hmac.compare_digest(request.headers.get("Authorization", "").encode(), expected.encode())
 
 
-@app.route("/", methods=["GET"])
+@routes.route("/cases/ingest", methods=["POST"])
+def ingest_cases():
+    """
+    Bulk-append case reports: POST a CSV or NDJSON body (?format=csv|ndjson overrides Content-Type)
+    with "Authorization: Bearer <INGEST_TOKEN>". Without INGEST_TOKEN configured the endpoint is off.
+    """
+    if not INGEST_TOKEN:
+        return {"error": "ingestion over HTTP is disabled"}, 404
+    if not _ingest_authorized():
+        return {"error": "unauthorized"}, 401
+    fmt = request.args.get("format") or ingest.format_for(content_type=request.content_type)
+    try:
+        result = ingest.ingest(ingest.open_text(request.stream), fmt)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    body = {
+        "accepted": result["accepted"],
+        "rejected": result["rejected"],
+        "errors": [{"line": line, "error": message} for line, message in result["errors"]],
+    }
+    if result["aborted"]:
+        body["error"] = result["aborted"]
+        return body, 400
+    return body
+
+
+@routes.route("/", methods=["GET"])
 def home():
     return "Server is running!"
 
+
+@routes.route("/ready", methods=["GET"])
+def ready():
+    """200 once warm-up has finished (or was skipped), 503 while it is still running."""
+    if _ready.is_set():
+        return {"ready": True, "warmup_seconds": _warmup["seconds"], "error": _warmup["error"]}
+    return {"ready": False}, 503
+
+
+def warm_up():
+    """
+    Pay the first-request costs up front: open a pooled DB connection, load the knowledge
+    index with its ranker and typo index, build the reply catalog and prewarm translations. Failures are logged and
+    reported by /ready; lazy initialization still covers anything that did not warm.
+    """
+    started = time.monotonic()
+    _warmup["started"] = started
+    try:
+        db.connect_db().close()
+        snapshot.current()
+        if LOOKUP_BACKEND != "db":
+            index = get_index()
+            # both are built lazily on first use, which would land on the first lookup
+            index.ranker
+            index.fuzzy
+        prewarm_translations()
+    except Exception as e:
+        print("Warm-up failed:", e)
+        _warmup["error"] = str(e)
+    _warmup["seconds"] = round(time.monotonic() - started, 3)
+    print(f"Warm-up finished in {_warmup['seconds']}s")
+    _ready.set()
+
+
+def create_app(warmup=WARMUP_MODE):
+    """
+    Build the Flask app. `warmup` is "background" (serve immediately, warm in a thread),
+    "blocking" (warm before returning) or "off" (everything initializes on first use).
+    """
+    app = Flask(__name__)
+    app.register_blueprint(routes)
+    if warmup == "blocking":
+        warm_up()
+    elif warmup == "background":
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    else:
+        _ready.set()
+    return app
+
+
+_app_lock = threading.Lock()
+
+
+def __getattr__(name):
+    # `bot.app` (gunicorn bot:app, flask --app bot) still works: built on first access, so
+    # importing bot for its functions does not create an app or start a warm-up
+    global app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _app_lock:
+        if "app" not in globals():
+            app = create_app()
+    return app
+
+
 if __name__ == "__main__":
     #send_startup_alert()  # send alert immediately when bot starts
-    app.run(port=5000, debug=True)
\ No newline at end of file
+    create_app(warmup="blocking").run(port=5000, debug=True)
\ No newline at end of file
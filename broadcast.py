@@ -0,0 +1,161 @@
+# broadcast.py
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from db import connect_db
+from ratelimit import TokenBucket
+from config import BROADCAST_RATE, BROADCAST_WORKERS, BROADCAST_PAGE_SIZE
+
+LANGUAGE_PROMPT = "\n\nChoose your language: Hindi, Odia, English"
+MAX_ATTEMPTS = 4
+RETRY_BASE_DELAY = 1.0
+
+
+def add_subscriber(phone, language=None):
+    conn = connect_db()
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT INTO subscribers (phone, language, active) VALUES (%s, %s, 1) "
+        "ON DUPLICATE KEY UPDATE language = VALUES(language), active = 1",
+        (phone, language)
+    )
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def remove_subscriber(phone):
+    conn = connect_db()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE subscribers SET active = 0 WHERE phone = %s", (phone,))
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def render_alert(disease_name, num_cases, languages=("en", "hi", "or")):
+    """One finished message body per language (None = no language chosen yet)."""
+    import catalog
+    bodies = {}
+    for lang in languages:
+        bodies[lang] = catalog.render("alert", lang, catalog.term(disease_name, lang), num_cases)
+    bodies[None] = bodies.get("en", catalog.render("alert", "en", disease_name, num_cases)) + LANGUAGE_PROMPT
+    return bodies
+
+
+def _is_retryable(error):
+    status = getattr(error, "status", None)
+    return status is None or status == 429 or status >= 500
+
+
+def _send_with_retry(send, to, body, bucket):
+    for attempt in range(MAX_ATTEMPTS):
+        bucket.acquire()  # every attempt is a request against the provider's rate limit
+        try:
+            send(to, body)
+            return True
+        except Exception as e:
+            if attempt == MAX_ATTEMPTS - 1 or not _is_retryable(e):
+                print("Broadcast send failed:", to, e)
+                return False
+            time.sleep(RETRY_BASE_DELAY * (2 ** attempt) + random.uniform(0, RETRY_BASE_DELAY))
+    return False
+
+
+def _load_progress(cursor, broadcast_id):
+    cursor.execute(
+        "SELECT last_subscriber_id, sent, failed FROM broadcast_progress WHERE broadcast_id = %s",
+        (broadcast_id,)
+    )
+    row = cursor.fetchone()
+    return row if row else (0, 0, 0)
+
+
+def _save_progress(cursor, broadcast_id, last_id, sent, failed):
+    cursor.execute(
+        "INSERT INTO broadcast_progress (broadcast_id, last_subscriber_id, sent, failed) VALUES (%s, %s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE last_subscriber_id = VALUES(last_subscriber_id), "
+        "sent = VALUES(sent), failed = VALUES(failed)",
+        (broadcast_id, last_id, sent, failed)
+    )
+
+
+def broadcast(broadcast_id, bodies, send, rate=BROADCAST_RATE, workers=BROADCAST_WORKERS,
+              page_size=BROADCAST_PAGE_SIZE):
+    """
+    Send each active subscriber the body for their language.
+    - subscribers are read in subscriber_id pages; progress is checkpointed after every page,
+      so re-running the same broadcast_id resumes after the last finished page
+    - sends run on a thread pool behind a shared token bucket (`rate` messages/second, retries included)
+    - rate-limited (429), server and network errors are retried with exponential backoff
+    Returns (sent, failed) totals for the broadcast.
+    """
+    bucket = TokenBucket(rate)
+    conn = connect_db()
+    cursor = conn.cursor()
+    last_id, sent, failed = _load_progress(cursor, broadcast_id)
+    counts_lock = threading.Lock()
+    counts = {"sent": sent, "failed": failed}
+
+    def deliver(phone, language):
+        body = bodies.get(language) or bodies[None]
+        ok = _send_with_retry(send, phone, body, bucket)
+        with counts_lock:
+            counts["sent" if ok else "failed"] += 1
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            cursor.execute(
+                "SELECT subscriber_id, phone, language FROM subscribers "
+                "WHERE active = 1 AND subscriber_id > %s ORDER BY subscriber_id LIMIT %s",
+                (last_id, page_size)
+            )
+            page = cursor.fetchall()
+            if not page:
+                break
+            list(pool.map(lambda row: deliver(row[1], row[2]), page))
+            last_id = page[-1][0]
+            _save_progress(cursor, broadcast_id, last_id, counts["sent"], counts["failed"])
+            conn.commit()
+
+    cursor.close()
+    conn.close()
+    elapsed = time.monotonic() - started
+    print(f"Broadcast {broadcast_id}: {counts['sent']} sent, {counts['failed']} failed in {elapsed:.1f}s")
+    return counts["sent"], counts["failed"]
+
+
+def twilio_sender(client, from_number):
+    """Adapt a Twilio client (or FakeTwilioClient) to the send(to, body) callable broadcast() uses."""
+    def send(to, body):
+        client.messages.create(from_=from_number, to=to, body=body)
+    return send
+
+
+class FakeTwilioClient:
+    """
+    Stand-in for twilio.rest.Client: records every message and can fail on demand.
+    `fail_first` makes the first N create() calls raise a 429-style error.
+    """
+
+    class _Error(Exception):
+        def __init__(self, status):
+            super().__init__(f"HTTP {status}")
+            self.status = status
+
+    def __init__(self, fail_first=0, fail_status=429):
+        self.sent = []
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self._lock = threading.Lock()
+        self.messages = self
+
+    def create(self, from_, to, body):
+        with self._lock:
+            if self.fail_first > 0:
+                self.fail_first -= 1
+                raise self._Error(self.fail_status)
+            self.sent.append({"from": from_, "to": to, "body": body})
+        return self
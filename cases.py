@@ -0,0 +1,179 @@
+# cases.py
+import datetime
+from cache import LRUCache
+from db import connect_db
+from repository import daily_case_totals
+from config import ALERT_TOP_N, SNAPSHOT_TTL
+
+# date -> snapshot dict; short TTL because other processes may add cases too
+_snapshots = LRUCache(maxsize=64, ttl=SNAPSHOT_TTL)
+
+
+PERIODS = ("week", "month")
+
+
+def period_start(day, period):
+    """First day of the ISO week (Monday) or calendar month containing `day`."""
+    if period == "week":
+        return day - datetime.timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown period: {period}")
+
+
+def add_cases(rows, conn=None):
+    """
+    Append (disease_id, case_date, num_cases[, district]) rows and fold them into
+    case_daily_summary and the weekly/monthly case_rollups in the same transaction,
+    so alert and trend queries never have to aggregate raw cases.
+    """
+    rows = [tuple(row) + (None,) * (4 - len(row)) for row in rows]
+    if not rows:
+        return 0
+    own_conn = conn is None
+    conn = conn or connect_db()
+    cursor = conn.cursor()
+
+    totals = {}
+    rollups = {}
+    for disease_id, case_date, num_cases, _ in rows:
+        key = (case_date, disease_id)
+        totals[key] = totals.get(key, 0) + num_cases
+        day = _as_date(case_date)
+        for period in PERIODS:
+            key = (period, period_start(day, period), disease_id)
+            rollups[key] = rollups.get(key, 0) + num_cases
+
+    cursor.executemany(
+        "INSERT INTO cases (disease_id, case_date, num_cases, district) VALUES (%s, %s, %s, %s)",
+        rows
+    )
+    cursor.executemany(
+        "INSERT INTO case_daily_summary (summary_date, disease_id, total_cases) VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE total_cases = total_cases + VALUES(total_cases)",
+        [(day, disease_id, total) for (day, disease_id), total in totals.items()]
+    )
+    cursor.executemany(
+        "INSERT INTO case_rollups (period, period_start, disease_id, total_cases) VALUES (%s, %s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE total_cases = total_cases + VALUES(total_cases)",
+        [(period, start, disease_id, total) for (period, start, disease_id), total in rollups.items()]
+    )
+    conn.commit()
+    cursor.close()
+    if own_conn:
+        conn.close()
+
+    for day, _ in totals:
+        _snapshots.pop(_as_date(day))
+    return len(rows)
+
+
+def rebuild_summary(conn=None):
+    """Recompute case_daily_summary and case_rollups from the raw cases table (backfill / repair)."""
+    own_conn = conn is None
+    conn = conn or connect_db()
+    cursor = conn.cursor()
+    rebuild_summary_tables(cursor)
+    conn.commit()
+    cursor.close()
+    if own_conn:
+        conn.close()
+    _snapshots.clear()
+
+
+def rebuild_summary_tables(cursor):
+    """The statements behind rebuild_summary(), without committing (also run by migrations.py)."""
+    cursor.execute("DELETE FROM case_daily_summary")
+    cursor.execute("""
+        INSERT INTO case_daily_summary (summary_date, disease_id, total_cases)
+        SELECT case_date, disease_id, SUM(num_cases)
+        FROM cases
+        GROUP BY case_date, disease_id
+    """)
+    # Rollups are built from the daily summary, which is already one row per day and disease
+    cursor.execute("DELETE FROM case_rollups")
+    cursor.execute("""
+        INSERT INTO case_rollups (period, period_start, disease_id, total_cases)
+        SELECT 'week', DATE_SUB(summary_date, INTERVAL WEEKDAY(summary_date) DAY), disease_id, SUM(total_cases)
+        FROM case_daily_summary
+        GROUP BY 2, disease_id
+    """)
+    cursor.execute("""
+        INSERT INTO case_rollups (period, period_start, disease_id, total_cases)
+        SELECT 'month', DATE_SUB(summary_date, INTERVAL DAYOFMONTH(summary_date) - 1 DAY), disease_id, SUM(total_cases)
+        FROM case_daily_summary
+        GROUP BY 2, disease_id
+    """)
+
+
+def get_rollups(period, start, end, disease_name=None):
+    """
+    [{"disease", "period_start", "cases"}] for weekly or monthly buckets starting in [start, end],
+    optionally for a single disease. Reads case_rollups only; never scans raw cases.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period: {period}")
+    query = """
+        SELECT d.disease_name, r.period_start, r.total_cases
+        FROM case_rollups r
+        JOIN diseases d ON r.disease_id = d.disease_id
+        WHERE r.period = %s AND r.period_start BETWEEN %s AND %s
+    """
+    params = [period, period_start(_as_date(start), period), _as_date(end)]
+    if disease_name:
+        query += " AND d.disease_name = %s"
+        params.append(disease_name)
+    query += " ORDER BY r.period_start, d.disease_name"
+
+    conn = connect_db()
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return [{"disease": name, "period_start": start, "cases": total} for name, start, total in rows]
+
+
+def _as_date(day):
+    if isinstance(day, str):
+        return datetime.date.fromisoformat(day)
+    return day
+
+
+def daily_snapshot(day=None):
+    """
+    Precomputed view of one day, cached per date:
+    {"date", "total", "previous_total", "diseases": [{"disease", "cases", "previous", "change"}...], "top"}
+    `diseases` is sorted by cases (desc); `top` holds the first ALERT_TOP_N of them.
+    """
+    day = _as_date(day or datetime.date.today())
+    snapshot = _snapshots.get(day)
+    if snapshot is not None:
+        return snapshot
+
+    previous_day = day - datetime.timedelta(days=1)
+    rows = daily_case_totals(day, previous_day)
+
+    today_counts = {name: total for name, date, total in rows if date == day}
+    previous_counts = {name: total for name, date, total in rows if date == previous_day}
+    diseases = sorted(
+        (
+            {
+                "disease": name,
+                "cases": total,
+                "previous": previous_counts.get(name, 0),
+                "change": total - previous_counts.get(name, 0),
+            }
+            for name, total in today_counts.items()
+        ),
+        key=lambda item: (-item["cases"], item["disease"])
+    )
+    snapshot = {
+        "date": day,
+        "total": sum(today_counts.values()),
+        "previous_total": sum(previous_counts.values()),
+        "diseases": diseases,
+        "top": diseases[:ALERT_TOP_N],
+    }
+    _snapshots.set(day, snapshot)
+    return snapshot
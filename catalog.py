@@ -0,0 +1,174 @@
+# catalog.py
+import re
+import threading
+import knowledge
+from knowledge import get_index
+from translation import translate
+
+# Reply skeletons; positional placeholders survive machine translation better than names.
+TEMPLATES = {
+    "possible_diseases": "Possible diseases:",
+    "disease_line": "- {0}: Symptoms [{1}], Prevention [{2}]",
+    "disease_info": "ℹ{0}\nSymptoms: {1}\nPrevention: {2}",
+    "no_symptom_match": "No diseases found matching those symptoms.",
+    "no_data": "No data found for '{0}'.",
+    "alert": "Disease Alert: Today {0} has {1} reported cases.",
+}
+
+SUPPORTED_LANGUAGES = ("hi", "or")
+
+_PLACEHOLDER = re.compile(r"\{\d+\}")
+
+_templates = {"en": dict(TEMPLATES)}
+_terms = {}
+_build_lock = threading.Lock()
+_language_locks = {lang: threading.Lock() for lang in SUPPORTED_LANGUAGES}
+_version = 0  # bumped whenever built languages change (see version())
+_latest = None  # index of the newest knowledge refresh
+
+
+def _localize_template(text, lang):
+    localized = translate(text, source="en", target=lang)
+    # keep the English skeleton if the translator mangled the placeholders
+    if sorted(_PLACEHOLDER.findall(localized)) != sorted(_PLACEHOLDER.findall(text)):
+        return text
+    return localized
+
+
+def _catalog_terms(index):
+    """Every disease, symptom and prevention string a reply can contain."""
+    terms = set(index.disease_names.values())
+    terms.update(index.symptom_names.values())
+    for items in index.preventions.values():
+        terms.update(items)
+    return terms
+
+
+def build(lang, index=None):
+    """
+    Translate the templates and all knowledge-base strings for `lang`. A language that is
+    already built keeps its templates and term translations; only new terms are translated.
+    """
+    if lang == "en":
+        return
+    index = index or get_index()
+    templates = _templates.get(lang)
+    if templates is None:
+        templates = {}
+        for key, text in TEMPLATES.items():
+            try:
+                templates[key] = _localize_template(text, lang)
+            except Exception as e:
+                print("Catalog translation failed:", lang, key, e)
+                templates[key] = text
+    previous = _terms.get(lang, {})
+    terms = {}
+    for text in _catalog_terms(index):
+        if text in previous:
+            terms[text] = previous[text]
+            continue
+        try:
+            terms[text] = translate(text, source="en", target=lang)
+        except Exception as e:
+            print("Catalog translation failed:", lang, text, e)
+    global _version
+    with _build_lock:
+        _templates[lang] = templates
+        _terms[lang] = terms
+        _version += 1
+
+
+def _language_lock(lang):
+    with _build_lock:
+        return _language_locks.setdefault(lang, threading.Lock())
+
+
+def _rebuild_in_background(lang, index):
+    with _language_lock(lang):
+        if index is _latest:  # a newer refresh has its own thread queued behind this lock
+            build(lang, index)
+
+
+def _refresh(index):
+    """
+    Knowledge data changed: re-translate built languages on background threads. Replies keep
+    using the current templates and terms until the new ones are swapped in.
+    """
+    global _latest
+    _latest = index
+    threads = []
+    for lang in [lang for lang in list(_templates) if lang != "en"]:
+        thread = threading.Thread(target=_rebuild_in_background, args=(lang, index),
+                                  name=f"catalog-{lang}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+
+knowledge.on_refresh(_refresh)
+
+
+def clear():
+    """Drop every built language; each is built again on its next use."""
+    global _version
+    with _build_lock:
+        _version += 1
+        for lang in list(_templates):
+            if lang != "en":
+                del _templates[lang]
+        _terms.clear()
+
+
+def rebuild(languages=SUPPORTED_LANGUAGES):
+    index = get_index()
+    for lang in languages:
+        with _language_lock(lang):
+            build(lang, index)
+
+
+def _ensure(lang):
+    # one build per language at a time; concurrent requests wait for it instead of repeating it
+    if lang not in _templates:
+        with _language_lock(lang):
+            if lang not in _templates:
+                build(lang)
+
+
+def render(key, lang, *args):
+    _ensure(lang)
+    return _templates.get(lang, TEMPLATES)[key].format(*args)
+
+
+def term(text, lang):
+    if lang == "en" or not text:
+        return text
+    _ensure(lang)
+    return _terms.get(lang, {}).get(text, text)
+
+
+def version():
+    return _version
+
+
+def localized_terms(lang):
+    """English term -> localized term for a language that has been built ({} otherwise)."""
+    return _terms.get(lang, {})
+
+
+def terms(joined, lang, sep=","):
+    """
+    Localize a joined list (e.g. "fever, chills") piece by piece. Pieces are rejoined greedily
+    while they form a known term, so items that contain `sep` themselves are still found.
+    """
+    if lang == "en" or not joined:
+        return joined
+    _ensure(lang)
+    known = _terms.get(lang, {})
+    parts = joined.split(sep)
+    localized = []
+    i = 0
+    while i < len(parts):
+        end = next((j for j in range(len(parts), i + 1, -1) if sep.join(parts[i:j]).strip() in known), i + 1)
+        localized.append(term(sep.join(parts[i:end]).strip(), lang))
+        i = end
+    return sep.join(localized)
@@ -15,4 +15,79 @@ MYSQL_CONFIG = {
     "password": os.getenv("MYSQL_PASSWORD"),
     "database": os.getenv("MYSQL_DATABASE"),
     "auth_plugin": "mysql_native_password"
-}
\ No newline at end of file
+}
+
+MYSQL_POOL_NAME = os.getenv("MYSQL_POOL_NAME", "health_pool")
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "10"))
+MYSQL_POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", "5"))
+
+# "indexed" = exact/prefix/token matches first, substring LIKE as fallback; "substring" = LIKE only
+MATCH_MODE = os.getenv("MATCH_MODE", "indexed")
+
+# "google" (deep_translator), "libretranslate" (HTTP, TRANSLATE_URL) or "stub" (offline, for tests/benchmarks)
+TRANSLATOR_BACKEND = os.getenv("TRANSLATOR_BACKEND", "google")
+TRANSLATE_URL = os.getenv("TRANSLATE_URL", "http://localhost:5001")
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "2048"))
+# SQLite file that keeps translations across restarts; empty disables it
+TRANSLATION_CACHE_PATH = os.getenv("TRANSLATION_CACHE_PATH", "")
+
+# "sync" answers inside the webhook; "async" acknowledges at once and replies via the REST API
+WEBHOOK_MODE = os.getenv("WEBHOOK_MODE", "sync")
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "4"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "1000"))
+
+# "index" answers lookups from the in-memory knowledge index, "db" queries MySQL every time
+LOOKUP_BACKEND = os.getenv("LOOKUP_BACKEND", "index")
+MYSQL_ASYNC_POOL_SIZE = int(os.getenv("MYSQL_ASYNC_POOL_SIZE", "20"))
+
+# "memory" (per process), "mysql" or "redis" (shared between workers/hosts)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_TTL = int(os.getenv("SESSION_TTL", str(7 * 24 * 3600)))
+SESSION_MAX = int(os.getenv("SESSION_MAX", "100000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# seconds between data_version checks by the in-memory knowledge index (0 disables)
+KNOWLEDGE_VERSION_CHECK = float(os.getenv("KNOWLEDGE_VERSION_CHECK", "30"))
+# symptom terms whose matches the knowledge index remembers
+TERM_CACHE_SIZE = int(os.getenv("TERM_CACHE_SIZE", "4096"))
+
+# binary export of the knowledge tables written by seed/sync; workers load their index from it, not MySQL ("" disables)
+KNOWLEDGE_SNAPSHOT = os.getenv("KNOWLEDGE_SNAPSHOT", "")
+
+# how many diseases a symptom reply lists at most
+RESULT_TOP_K = int(os.getenv("RESULT_TOP_K", "3"))
+
+# outbound alert broadcasts: messages/second across all sender threads
+BROADCAST_RATE = float(os.getenv("BROADCAST_RATE", "10"))
+BROADCAST_WORKERS = int(os.getenv("BROADCAST_WORKERS", "8"))
+BROADCAST_PAGE_SIZE = int(os.getenv("BROADCAST_PAGE_SIZE", "500"))
+
+# daily case snapshot: how many diseases count as "top", and how long a cached day stays fresh
+ALERT_TOP_N = int(os.getenv("ALERT_TOP_N", "5"))
+SNAPSHOT_TTL = float(os.getenv("SNAPSHOT_TTL", "60"))
+
+# shared secret for POST /cases/ingest (sent as "Authorization: Bearer <token>"); unset disables the endpoint
+INGEST_TOKEN = os.getenv("INGEST_TOKEN", "")
+
+# allow the runtime sampling profiler at /debug/profile
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "0") == "1"
+
+# rendered reply cache; "nothing found" replies expire sooner
+REPLY_CACHE_SIZE = int(os.getenv("REPLY_CACHE_SIZE", "10000"))
+REPLY_CACHE_TTL = float(os.getenv("REPLY_CACHE_TTL", "3600"))
+REPLY_NEGATIVE_TTL = float(os.getenv("REPLY_NEGATIVE_TTL", "300"))
+
+# startup: "background" warms caches in a thread, "blocking" before serving, "off" lazily on first use
+WARMUP_MODE = os.getenv("WARMUP_MODE", "background")
+
+# inbound webhook: replayed MessageSids get the stored TwiML back (a retry of a message still
+# being processed waits up to REPLAY_WAIT seconds for it)
+IDEMPOTENCY_SIZE = int(os.getenv("IDEMPOTENCY_SIZE", "50000"))
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "3600"))
+REPLAY_WAIT = float(os.getenv("REPLAY_WAIT", "10"))
+
+# inbound backpressure: messages/second per sender (0 disables) with bursts of SENDER_BURST,
+# and how many messages one process works on at once before answering with BUSY_REPLY
+SENDER_RATE = float(os.getenv("SENDER_RATE", "0.5"))
+SENDER_BURST = float(os.getenv("SENDER_BURST", "5"))
+MAX_IN_FLIGHT = int(os.getenv("MAX_IN_FLIGHT", "64"))
@@ -1,14 +1,140 @@
 # db.py
 import re
-import datetime
-import mysql.connector
-from config import MYSQL_CONFIG
-
-
-def connect_db():
-    return mysql.connector.connect(**MYSQL_CONFIG)
-
+import sys
+import time
+import weakref
+import threading
+from functools import lru_cache
+from config import MYSQL_CONFIG, MYSQL_POOL_NAME, MYSQL_POOL_SIZE, MYSQL_POOL_TIMEOUT, MATCH_MODE
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_pool_stats = {
+    "checkouts": 0,
+    "waits": 0,
+    "timeouts": 0,
+    "reconnects": 0,
+    "in_use": 0,
+    "peak_in_use": 0,
+    "wait_seconds": 0.0,
+}
+# physical connection -> {statement: prepared cursor}; server-side handles live as long as
+# the session, which now outlasts a checkout because returning a connection only rolls back
+_statements = weakref.WeakKeyDictionary()
+
+
+def _statements_for(cnx):
+    # the pool hands out a fresh PooledMySQLConnection wrapper per checkout around the same
+    # MySQLConnection, so the cache is keyed on the wrapped connection
+    physical = getattr(cnx, "_cnx", cnx)
+    with _pool_lock:
+        cursors = _statements.get(physical)
+        if cursors is None:
+            cursors = _statements[physical] = {}
+    return cursors
+
+
+class _PooledConnection:
+    """
+    Proxy around a pooled connection that keeps the usage counters honest on close().
+    `statements` is repository.py's prepared cursor cache for the underlying connection; it
+    is shared by every checkout of that connection and emptied when its session is replaced.
+    """
 
+    __slots__ = ("_cnx", "_released", "statements")
+
+    def __init__(self, cnx):
+        self._cnx = cnx
+        self._released = False
+        self.statements = _statements_for(cnx)
+
+    def __getattr__(self, name):
+        return getattr(self._cnx, name)
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        with _pool_lock:
+            _pool_stats["in_use"] -= 1
+        try:
+            # end the transaction (and its read snapshot) but keep the session, so the
+            # prepared statements are still valid on the next checkout
+            self._cnx.rollback()
+        except Exception:
+            # the session is gone; connect_db() reconnects it before handing it out again
+            self.statements.clear()
+        self._cnx.close()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # imported here: mysql.connector is slow to import and not needed until the first query
+                from mysql.connector import pooling
+                # no COM_RESET_CONNECTION on return: it would deallocate every prepared
+                # statement; _PooledConnection.close() rolls back instead
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name=MYSQL_POOL_NAME,
+                    pool_size=MYSQL_POOL_SIZE,
+                    pool_reset_session=False,
+                    **MYSQL_CONFIG
+                )
+    return _pool
+
+
+def connect_db(timeout=None):
+    """
+    Check a connection out of the shared pool.
+    - waits up to `timeout` seconds (MYSQL_POOL_TIMEOUT by default) when the pool is exhausted
+    - pings the connection and reconnects it if the server dropped it while idle
+    - close() hands the connection back to the pool instead of disconnecting
+    """
+    from mysql.connector.errors import PoolError
+    pool = _get_pool()
+    limit = MYSQL_POOL_TIMEOUT if timeout is None else timeout
+    start = time.monotonic()
+    waited = False
+    while True:
+        try:
+            cnx = pool.get_connection()
+            break
+        except PoolError:
+            if time.monotonic() - start >= limit:
+                with _pool_lock:
+                    _pool_stats["timeouts"] += 1
+                raise
+            waited = True
+            time.sleep(0.01)
+
+    if not cnx.is_connected():
+        cnx.reconnect(attempts=2, delay=0)
+        _statements_for(cnx).clear()  # prepared in the old session
+        with _pool_lock:
+            _pool_stats["reconnects"] += 1
+
+    with _pool_lock:
+        _pool_stats["checkouts"] += 1
+        _pool_stats["in_use"] += 1
+        _pool_stats["peak_in_use"] = max(_pool_stats["peak_in_use"], _pool_stats["in_use"])
+        if waited:
+            _pool_stats["waits"] += 1
+            _pool_stats["wait_seconds"] += time.monotonic() - start
+    return _PooledConnection(cnx)
+
+
+def pool_stats():
+    """Snapshot of pool usage counters (plus the configured size)."""
+    with _pool_lock:
+        stats = dict(_pool_stats)
+    stats["size"] = MYSQL_POOL_SIZE
+    return stats
+
+
+@lru_cache(maxsize=8192)
 def normalize_word(word: str) -> str:
     """
     More aggressive normalization for matching:
@@ -26,41 +152,13 @@ def normalize_word(word: str) -> str:
     return w
 
 
-def _insert_disease_get_id(cursor, name: str):
-    name_norm = normalize_word(name)
-    cursor.execute("INSERT IGNORE INTO diseases (disease_name) VALUES (%s)", (name_norm,))
-    cursor.execute("SELECT disease_id FROM diseases WHERE disease_name = %s", (name_norm,))
-    row = cursor.fetchone()
-    return row[0]
-
-
-def _insert_symptom_get_id(cursor, symptom: str):
-    s = normalize_word(symptom)
-    cursor.execute("INSERT IGNORE INTO symptoms (symptom_name) VALUES (%s)", (s,))
-    cursor.execute("SELECT symptom_id FROM symptoms WHERE symptom_name = %s", (s,))
-    row = cursor.fetchone()
-    return row[0]
-
+_TOKEN_STOPWORDS = {"of", "or", "and", "with"}
 
-def _link_disease_symptom(cursor, disease_id: int, symptom_id: int):
-    cursor.execute(
-        "INSERT IGNORE INTO disease_symptoms (disease_id, symptom_id) VALUES (%s, %s)",
-        (disease_id, symptom_id)
-    )
-
-
-def _add_prevention(cursor, disease_id: int, text: str):
-    cursor.execute(
-        "INSERT INTO preventions (disease_id, prevention_text) VALUES (%s, %s)",
-        (disease_id, text)
-    )
 
-
-def _add_case(cursor, disease_id: int, case_date, num_cases: int):
-    cursor.execute(
-        "INSERT INTO cases (disease_id, case_date, num_cases) VALUES (%s, %s, %s)",
-        (disease_id, case_date, num_cases)
-    )
+def _symptom_tokens(symptom: str):
+    """Normalized words of a symptom name, used for indexed single-word matches."""
+    tokens = {normalize_word(t) for t in symptom.split()}
+    return {t for t in tokens if len(t) > 2 and t not in _TOKEN_STOPWORDS}
 
 
 def _generate_variants(symptom: str, custom_variants: dict):
@@ -77,8 +175,19 @@ def _generate_variants(symptom: str, custom_variants: dict):
     return variants
 
 
-def seed_database():
-    """Drop tables (safely), recreate, and seed the dataset."""
+def bump_data_version(cursor):
+    """Mark the knowledge tables as changed so in-process caches rebuild."""
+    cursor.execute(
+        "INSERT INTO data_meta (meta_key, meta_value) VALUES ('data_version', 1) "
+        "ON DUPLICATE KEY UPDATE meta_value = meta_value + 1"
+    )
+
+
+DATA_VERSION_QUERY = "SELECT meta_value FROM data_meta WHERE meta_key = 'data_version'"
+
+
+def seed_database(dataset_path=None):
+    """Bring the schema up to date, empty the data tables and bulk-load the dataset (data/seed.json by default)."""
     conn = connect_db()
     cursor = conn.cursor()
 
@@ -87,184 +196,21 @@ def seed_database():
     cursor.execute(f"USE `{db_name}`")
 
 
-    cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
-    cursor.execute("DROP TABLE IF EXISTS cases")
-    cursor.execute("DROP TABLE IF EXISTS disease_symptoms")
-    cursor.execute("DROP TABLE IF EXISTS preventions")
-    cursor.execute("DROP TABLE IF EXISTS symptoms")
-    cursor.execute("DROP TABLE IF EXISTS diseases")
-    cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
-
-
-    cursor.execute("""
-        CREATE TABLE diseases (
-            disease_id INT AUTO_INCREMENT PRIMARY KEY,
-            disease_name VARCHAR(100) UNIQUE
-        )
-    """)
-    cursor.execute("""
-        CREATE TABLE symptoms (
-            symptom_id INT AUTO_INCREMENT PRIMARY KEY,
-            symptom_name VARCHAR(100) UNIQUE
-        )
-    """)
-    cursor.execute("""
-        CREATE TABLE disease_symptoms (
-            disease_id INT,
-            symptom_id INT,
-            FOREIGN KEY (disease_id) REFERENCES diseases(disease_id) ON DELETE CASCADE,
-            FOREIGN KEY (symptom_id) REFERENCES symptoms(symptom_id) ON DELETE CASCADE
-        )
-    """)
-    cursor.execute("""
-        CREATE TABLE preventions (
-            prevention_id INT AUTO_INCREMENT PRIMARY KEY,
-            disease_id INT,
-            prevention_text VARCHAR(255),
-            FOREIGN KEY (disease_id) REFERENCES diseases(disease_id) ON DELETE CASCADE
-        )
-    """)
-    cursor.execute("""
-        CREATE TABLE cases (
-            case_id INT AUTO_INCREMENT PRIMARY KEY,
-            disease_id INT,
-            case_date DATE,
-            num_cases INT,
-            FOREIGN KEY (disease_id) REFERENCES diseases(disease_id) ON DELETE CASCADE
-        )
-    """)
-
-
-    diseases_data = {
-        "fever": {
-            "symptoms": ["high temperature", "sweating", "chills"],
-            "preventions": ["Stay hydrated", "Rest well", "Take paracetamol if needed"],
-            "cases": 120
-        },
-        "covid": {
-            "symptoms": ["cough", "fever", "loss of taste or smell"],
-            "preventions": ["Wear mask", "Sanitize hands", "Get vaccinated"],
-            "cases": 85
-        },
-        "malaria": {
-            "symptoms": ["fever", "chills", "sweating"],
-            "preventions": ["Use mosquito nets", "Avoid stagnant water", "Take preventive medication"],
-            "cases": 64
-        },
-        "dengue": {
-            "symptoms": ["rash", "fever", "joint pain"],
-            "preventions": ["Avoid mosquito bites", "Wear full sleeves", "Use repellents"],
-            "cases": 42
-        },
-        "typhoid": {
-            "symptoms": ["abdominal pain", "fever", "headache"],
-            "preventions": ["Drink clean water", "Wash fruits/vegetables", "Vaccination"],
-            "cases": 32
-        },
-        "tuberculosis": {
-            "symptoms": ["chronic cough", "weight loss", "fever"],
-            "preventions": ["Vaccination (BCG)", "Good ventilation", "Avoid contact with TB patients"],
-            "cases": 28
-        },
-        "asthma": {
-            "symptoms": ["shortness of breath", "wheezing", "coughing"],
-            "preventions": ["Avoid allergens", "Take inhalers", "Exercise regularly"],
-            "cases": 50
-        },
-        "pneumonia": {
-            "symptoms": ["chest pain", "fever", "cough with phlegm"],
-            "preventions": ["Vaccination", "Avoid smoking", "Seek early treatment"],
-            "cases": 23
-        },
-        "cholera": {
-            "symptoms": ["diarrhea", "vomiting", "dehydration"],
-            "preventions": ["Drink safe water", "Proper sanitation", "Oral rehydration"],
-            "cases": 14
-        },
-        "hepatitis": {
-            "symptoms": ["jaundice", "fatigue", "loss of appetite"],
-            "preventions": ["Vaccination", "Drink clean water", "Wash hands"],
-            "cases": 19
-        },
-        "chickenpox": {
-            "symptoms": ["rash", "fever", "itching"],
-            "preventions": ["Vaccination", "Avoid contact with infected", "Keep skin clean"],
-            "cases": 16
-        },
-        "measles": {
-            "symptoms": ["rash", "fever", "red eye"],
-            "preventions": ["MMR vaccine", "Avoid contact with infected", "Maintain hygiene"],
-            "cases": 10
-        },
-        "polio": {
-            "symptoms": ["muscle weakness", "paralysis", "fever"],
-            "preventions": ["Polio vaccine", "Good hygiene"],
-            "cases": 3
-        },
-        "influenza": {
-            "symptoms": ["fever", "body ache", "cough"],
-            "preventions": ["Flu shot", "Maintain hygiene", "Rest"],
-            "cases": 90
-        },
-        "hypertension": {
-            "symptoms": ["headache", "dizziness", "chest pain"],
-            "preventions": ["Eat healthy", "Exercise regularly", "Reduce salt intake"],
-            "cases": 110
-        }
-    }
-
-    disease_aliases = {
-        "tuberculosis": ["tb"],
-        "influenza": ["flu"],
-        "hypertension": ["high blood pressure"]
-    }
-
-    symptom_variants = {
-        "red eye": ["red eyes"],
-        "chronic cough": ["cough"],
-        "body ache": ["body aches"],
-        "coughing": ["cough"]
-    }
-    symptom_variants = { normalize_word(k): [normalize_word(v) for v in vals] for k, vals in symptom_variants.items() }
-
-    today = datetime.date.today()
-
-    for disease, details in diseases_data.items():
-        disease_id = _insert_disease_get_id(cursor, disease)
-
-        for symptom in details["symptoms"]:
-            variants = _generate_variants(symptom, symptom_variants)
-            for v in variants:
-                symptom_id = _insert_symptom_get_id(cursor, v)
-                _link_disease_symptom(cursor, disease_id, symptom_id)
-
-        for prevention in details["preventions"]:
-            _add_prevention(cursor, disease_id, prevention.strip())
-
-        _add_case(cursor, disease_id, today, details["cases"])
-
-        for alias in disease_aliases.get(disease, []):
-            alias_id = _insert_disease_get_id(cursor, alias)
-            cursor.execute(
-                "INSERT IGNORE INTO disease_symptoms (disease_id, symptom_id) "
-                "SELECT %s, symptom_id FROM disease_symptoms WHERE disease_id = %s",
-                (alias_id, disease_id)
-            )
-            cursor.execute(
-                "INSERT IGNORE INTO preventions (disease_id, prevention_text) "
-                "SELECT %s, prevention_text FROM preventions WHERE disease_id = %s",
-                (alias_id, disease_id)
-            )
-            cursor.execute(
-                "INSERT IGNORE INTO cases (disease_id, case_date, num_cases) "
-                "SELECT %s, case_date, num_cases FROM cases WHERE disease_id = %s",
-                (alias_id, disease_id)
-            )
-
-        conn.commit()
+    # The schema is owned by migrations.py; a reseed only empties and reloads the data tables
+    import migrations
+    migrations.migrate(conn)
+    migrations.clear_data(cursor)
+    conn.commit()
+
+    from loader import read_dataset, load_dataset, DEFAULT_DATASET
+    load_dataset(read_dataset(dataset_path or DEFAULT_DATASET), conn=conn)
+    bump_data_version(cursor)
+    conn.commit()
 
     cursor.close()
     conn.close()
+    import snapshot
+    snapshot.export()
     print("✅ Database seeded successfully with clean symptom variants!")
 
 
@@ -278,83 +224,76 @@ def _dedup_symptoms(raw: str):
     return ", ".join(sorted(canonical))
 
 
-def get_disease_info(disease_name):
-    conn = connect_db()
-    cursor = conn.cursor(dictionary=True)
+def _like_escape(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
 
-    query = """
-    SELECT d.disease_name AS disease, 
+def _match_modes():
+    """
+    Matching passes to try, in order:
+    - indexed: exact/prefix match on the indexed name columns plus symptom_tokens
+    - substring: the old LIKE '%term%' scan, only used when the indexed pass finds nothing
+    """
+    if MATCH_MODE == "substring":
+        return ("substring",)
+    return ("indexed", "substring")
+
+
+def _disease_match_join(disease_name: str, mode: str):
+    """Derived table of matching disease_ids (names and aliases), joined against diseases `d`."""
+    if mode == "indexed":
+        term = _like_escape(normalize_word(disease_name)) + "%"
+    else:
+        term = "%" + disease_name.lower() + "%"
+    join = (
+        "JOIN (SELECT disease_id FROM diseases WHERE disease_name LIKE %s "
+        "UNION SELECT disease_id FROM disease_aliases WHERE alias_name LIKE %s) m "
+        "ON m.disease_id = d.disease_id"
+    )
+    return join, [term, term]
+
+
+def _symptom_match_join(terms, mode: str):
+    """Derived table of matching symptom_ids (names, tokens, variants), joined against symptoms `s`."""
+    branches = []
+    params = []
+    for term in terms:
+        if mode == "indexed":
+            prefix = _like_escape(term) + "%"
+            branches.append("SELECT symptom_id FROM symptoms WHERE symptom_name LIKE %s")
+            params.append(prefix)
+            branches.append("SELECT symptom_id FROM symptom_tokens WHERE token = %s")
+            params.append(term)
+            branches.append("SELECT symptom_id FROM symptom_variants WHERE variant_name LIKE %s")
+            params.append(prefix)
+        else:
+            branches.append("SELECT symptom_id FROM symptoms WHERE symptom_name LIKE %s")
+            params.append("%" + term + "%")
+            branches.append("SELECT symptom_id FROM symptom_variants WHERE variant_name LIKE %s")
+            params.append("%" + term + "%")
+    join = "JOIN (" + " UNION ".join(branches) + ") m ON m.symptom_id = s.symptom_id"
+    return join, params
+
+
+def _disease_info_query(disease_name, mode: str):
+    join, params = _disease_match_join(disease_name, mode)
+    query = f"""
+    SELECT d.disease_name AS disease,
            GROUP_CONCAT(DISTINCT s.symptom_name) AS symptoms,
            GROUP_CONCAT(DISTINCT p.prevention_text) AS prevention
     FROM diseases d
+    {join}
     LEFT JOIN disease_symptoms ds ON d.disease_id = ds.disease_id
     LEFT JOIN symptoms s ON ds.symptom_id = s.symptom_id
     LEFT JOIN preventions p ON d.disease_id = p.disease_id
-    WHERE LOWER(d.disease_name) LIKE %s
     GROUP BY d.disease_id
+    ORDER BY d.disease_name = %s DESC, d.disease_id
     """
-    cursor.execute(query, ("%" + disease_name.lower() + "%",))
-    result = cursor.fetchone()
-
-    if result and result.get("symptoms"):
-        result["symptoms"] = _dedup_symptoms(result["symptoms"])
-
-    cursor.close()
-    conn.close()
-    return result
-
-
-def get_disease_by_symptom(symptom):
-    conn = connect_db()
-    cursor = conn.cursor(dictionary=True)
-
-    norm_symptom = normalize_word(symptom)
-    query = """
-    SELECT DISTINCT d.disease_name AS disease
-    FROM diseases d
-    JOIN disease_symptoms ds ON d.disease_id = ds.disease_id
-    JOIN symptoms s ON ds.symptom_id = s.symptom_id
-    WHERE LOWER(s.symptom_name) LIKE %s
-    """
-    cursor.execute(query, ("%" + norm_symptom + "%",))
-    results = cursor.fetchall()
-
-    cursor.close()
-    conn.close()
-    return results
-
-
-def get_today_alert(disease_name, today):
-    """
-    Returns a list of alerts (disease, cases, date) for diseases matching `disease_name` (LIKE),
-    on given date. This always returns a list (possibly empty).
-    """
-    conn = connect_db()
-    cursor = conn.cursor(dictionary=True)
-
-    query = """
-    SELECT d.disease_name AS disease, c.num_cases AS cases, c.case_date AS date
-    FROM cases c
-    JOIN diseases d ON c.disease_id = d.disease_id
-    WHERE LOWER(d.disease_name) LIKE %s AND c.case_date = %s
-    """
-    cursor.execute(query, ("%" + disease_name.lower() + "%", today))
-    results = cursor.fetchall()
+    return query, params + [normalize_word(disease_name)]
 
-    cursor.close()
-    conn.close()
-    return results
 
-
-def get_diseases_by_multiple_symptoms(symptoms):
-    conn = connect_db()
-    cursor = conn.cursor(dictionary=True)
-
-    normalized = [normalize_word(s) for s in symptoms if s.strip()]
-    if not normalized:
-        return []
-
-    like_clauses = " OR ".join(["LOWER(s.symptom_name) LIKE %s" for _ in normalized])
+def _multi_symptom_query(normalized, mode: str, limit=None):
+    join, params = _symptom_match_join(normalized, mode)
     query = f"""
     SELECT d.disease_name AS disease,
            GROUP_CONCAT(DISTINCT s.symptom_name) AS symptoms,
@@ -363,38 +302,44 @@ def get_diseases_by_multiple_symptoms(symptoms):
     FROM diseases d
     JOIN disease_symptoms ds ON d.disease_id = ds.disease_id
     JOIN symptoms s ON ds.symptom_id = s.symptom_id
+    {join}
     LEFT JOIN preventions p ON d.disease_id = p.disease_id
-    WHERE {like_clauses}
     GROUP BY d.disease_id
     HAVING matched_symptoms >= 1
     ORDER BY matched_symptoms DESC
     """
+    if limit:
+        query += "LIMIT %s\n"
+        params = params + [limit]
+    return query, params
 
-    values = [f"%{sym}%" for sym in normalized]
-    cursor.execute(query, values)
-    results = cursor.fetchall()
-
-    for row in results:
-        if row.get("symptoms"):
-            row["symptoms"] = _dedup_symptoms(row["symptoms"])
 
-    cursor.close()
-    conn.close()
-    return results
+def _symptom_query(symptom, mode: str):
+    join, params = _symptom_match_join([normalize_word(symptom)], mode)
+    query = f"""
+    SELECT DISTINCT d.disease_name AS disease
+    FROM diseases d
+    JOIN disease_symptoms ds ON d.disease_id = ds.disease_id
+    JOIN symptoms s ON ds.symptom_id = s.symptom_id
+    {join}
+    """
+    return query, params
 
 
-def get_all_diseases():
-    conn = connect_db()
-    cursor = conn.cursor(dictionary=True)
+def _today_alert_query(disease_name, today, mode: str):
+    join, params = _disease_match_join(disease_name, mode)
+    query = f"""
+    SELECT d.disease_name AS disease, c.total_cases AS cases, c.summary_date AS date
+    FROM case_daily_summary c
+    JOIN diseases d ON c.disease_id = d.disease_id
+    {join}
+    WHERE c.summary_date = %s
+    """
+    return query, params + [today]
 
-    query = "SELECT disease_name AS disease FROM diseases"
-    cursor.execute(query)
-    results = cursor.fetchall()
 
-    cursor.close()
-    conn.close()
-    return results
+ALL_DISEASES_QUERY = "SELECT disease_name AS disease FROM diseases"
 
 
 if __name__ == "__main__":
-    seed_database()
+    seed_database(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,87 @@
+# fuzzy.py
+MIN_WORD_LENGTH = 3
+# words of a phrase that are spell-checked; the rest pass through unchanged
+MAX_PHRASE_WORDS = 8
+
+
+def _deletes(word, max_distance):
+    """`word` plus every string reachable from it by up to `max_distance` deletions."""
+    found = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        nxt = set()
+        for w in frontier:
+            if len(w) <= 1:
+                continue
+            for i in range(len(w)):
+                nxt.add(w[:i] + w[i + 1:])
+        nxt -= found
+        found |= nxt
+        frontier = nxt
+    return found
+
+
+def edit_distance(a, b, limit):
+    """Optimal-string-alignment distance (adjacent swaps count once); > limit means "too far"."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = cur[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+            row_min = min(row_min, cur[j])
+        if row_min > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[len(b)]
+
+
+class FuzzyIndex:
+    """
+    SymSpell-style deletion index over single words. Every vocabulary word is stored under
+    all of its deletions (up to max_distance), so a lookup only hashes the query's own
+    deletions: cost depends on the query length, not on the vocabulary size.
+    """
+
+    def __init__(self, phrases, max_distance=2):
+        self.max_distance = max_distance
+        self.words = set()
+        for phrase in phrases:
+            self.words.update(w for w in phrase.split() if len(w) >= MIN_WORD_LENGTH)
+        self.max_length = max(map(len, self.words), default=0)
+        self.deletes = {}
+        for word in self.words:
+            for d in _deletes(word, max_distance):
+                self.deletes.setdefault(d, []).append(word)
+
+    def _limit(self, word):
+        return 1 if len(word) <= 4 else self.max_distance
+
+    def correct_word(self, word):
+        """Closest vocabulary word within the edit limit, or `word` unchanged."""
+        if word in self.words or len(word) < MIN_WORD_LENGTH:
+            return word
+        limit = self._limit(word)
+        if len(word) > self.max_length + limit:
+            # nothing in the vocabulary is close, and the deletions would be huge
+            return word
+        candidates = set()
+        for d in _deletes(word, limit):
+            candidates.update(self.deletes.get(d, ()))
+        best = None
+        for candidate in candidates:
+            dist = edit_distance(word, candidate, limit)
+            if dist <= limit and (best is None or (dist, candidate) < best):
+                best = (dist, candidate)
+        return best[1] if best else word
+
+    def correct(self, phrase):
+        words = phrase.split()
+        head = [self.correct_word(w) for w in words[:MAX_PHRASE_WORDS]]
+        return " ".join(head + words[MAX_PHRASE_WORDS:])
@@ -0,0 +1,135 @@
+# ingest.py
+import io
+import sys
+import csv
+import json
+import time
+import datetime
+from db import connect_db, normalize_word
+from repository import disease_name_ids
+from cases import add_cases
+
+BATCH_SIZE = 5000
+MAX_ERRORS = 20
+
+
+def iter_records(stream, fmt="csv"):
+    """
+    Yield (line_number, record dict) from a text stream without reading it all into memory.
+    CSV needs a header row; NDJSON is one JSON object per line. Unparseable lines yield None.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    if fmt != "ndjson":
+        raise ValueError(f"Unknown format: {fmt}")
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield line_number, record if isinstance(record, dict) else None
+
+
+def validate_record(record, diseases):
+    """(disease_id, case_date, num_cases, district) for a valid record; raises ValueError otherwise."""
+    if record is None:
+        raise ValueError("not a valid record")
+    name = str(record.get("disease") or "").strip()
+    disease_id = diseases.get(normalize_word(name))
+    if disease_id is None:
+        raise ValueError(f"unknown disease {name!r}")
+    try:
+        case_date = datetime.date.fromisoformat(str(record.get("date") or "").strip())
+    except ValueError:
+        raise ValueError(f"bad date {record.get('date')!r}")
+    if case_date > datetime.date.today():
+        raise ValueError(f"date {case_date} is in the future")
+    try:
+        num_cases = int(record.get("cases"))
+    except (TypeError, ValueError):
+        raise ValueError(f"bad case count {record.get('cases')!r}")
+    if num_cases < 0:
+        raise ValueError(f"negative case count {num_cases}")
+    district = str(record.get("district") or "").strip() or None
+    return disease_id, case_date, num_cases, district
+
+
+def ingest(stream, fmt="csv", conn=None, batch_size=BATCH_SIZE):
+    """
+    Validate case reports from `stream` one record at a time and append valid ones in
+    batches of `batch_size` (each batch also updates the daily summary and rollups).
+    Records need disease (name or alias), date (YYYY-MM-DD), cases and optionally district.
+    Returns {"accepted", "rejected", "errors": [(line, message)...], "aborted"} with at most
+    MAX_ERRORS errors; "aborted" is the reason reading stopped early (undecodable input), else None.
+    Rows read before an abort are still appended, so "accepted" always matches what was stored.
+    """
+    own_conn = conn is None
+    conn = conn or connect_db()
+    start = time.monotonic()
+
+    accepted = rejected = 0
+    errors = []
+    aborted = None
+    try:
+        diseases = disease_name_ids(conn)
+        batch = []
+        line = 0
+        try:
+            for line, record in iter_records(stream, fmt):
+                try:
+                    batch.append(validate_record(record, diseases))
+                except ValueError as e:
+                    rejected += 1
+                    if len(errors) < MAX_ERRORS:
+                        errors.append((line, str(e)))
+                    continue
+                if len(batch) >= batch_size:
+                    accepted += add_cases(batch, conn=conn)
+                    batch = []
+        except UnicodeDecodeError as e:
+            aborted = f"input is not valid UTF-8 after line {line}: {e.reason}"
+        if batch:
+            accepted += add_cases(batch, conn=conn)
+    finally:
+        if own_conn:
+            conn.close()
+    elapsed = time.monotonic() - start
+    print(f"Ingested {accepted} case rows ({rejected} rejected) in {elapsed:.2f}s "
+          f"({accepted / elapsed if elapsed else accepted:.0f} rows/sec)")
+    return {"accepted": accepted, "rejected": rejected, "errors": errors, "aborted": aborted}
+
+
+def format_for(filename=None, content_type=None):
+    """Pick csv or ndjson from a file extension or Content-Type header."""
+    hint = (content_type or filename or "").lower()
+    if "json" in hint:  # ndjson, jsonl, x-ndjson
+        return "ndjson"
+    return "csv"
+
+
+def open_text(binary_stream):
+    """Wrap a binary request/file stream so records can be decoded incrementally."""
+    return io.TextIOWrapper(binary_stream, encoding="utf-8", newline="")
+
+
+if __name__ == "__main__":
+    # Append case reports: python ingest.py <file.csv|file.ndjson|-> [batch_size] [--ndjson]
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    path = args[0] if args else "-"
+    batch = int(args[1]) if len(args) > 1 else BATCH_SIZE
+    fmt = "ndjson" if "--ndjson" in sys.argv else format_for(filename=path)
+    if path == "-":
+        result = ingest(sys.stdin, fmt, batch_size=batch)
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            result = ingest(f, fmt, batch_size=batch)
+    for line, message in result["errors"]:
+        print(f"  line {line}: {message}")
+    if result["aborted"]:
+        sys.exit(f"Stopped early: {result['aborted']}")
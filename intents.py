@@ -0,0 +1,209 @@
+# intents.py
+import threading
+import unicodedata
+from collections import deque
+import knowledge
+import catalog
+from knowledge import get_index
+
+# Declarative keyword table: intent -> keywords in English, Hindi and Odia.
+# "language:<code>" keywords pick a reply language; "vaccine" needs a vaccine word and a schedule word.
+# A bare "language_word" only asks to change language when the message is nothing else (besides
+# language names): "what language is this" is not a command.
+KEYWORDS = {
+    "language:en": ["english", "अंग्रेज़ी", "अंग्रेजी", "ଇଂରାଜୀ"],
+    "language:hi": ["hindi", "हिंदी", "हिन्दी", "ହିନ୍ଦୀ"],
+    "language:or": ["odia", "oriya", "ଓଡ଼ିଆ", "ଓଡିଆ", "ओड़िया", "ओडिया"],
+    "change_language": ["change language", "switch language", "भाषा बदलें", "ଭାଷା ବଦଳାନ୍ତୁ"],
+    "language_word": ["language", "भाषा", "ଭାଷା"],
+    "vaccine_word": ["vaccine", "vaccines", "vaccination", "टीका", "टीके", "टीकाकरण", "ଟୀକା", "ଟିକା", "ଟୀକାକରଣ"],
+    "schedule_word": ["schedule", "chart", "समय सारणी", "सारणी", "सूची", "ସୂଚୀ", "ତାଲିକା"],
+}
+
+
+class Intent:
+    """
+    kind: "change_language", "language", "vaccine", "disease", "symptom", "symptoms" or "unknown".
+    language: the language a language intent names. whole: the keyword was the entire message.
+    query: English text equivalent to the message when it could be resolved without translation.
+    """
+
+    __slots__ = ("kind", "language", "whole", "query")
+
+    def __init__(self, kind, language=None, whole=False, query=None):
+        self.kind = kind
+        self.language = language
+        self.whole = whole
+        self.query = query
+
+    def __repr__(self):
+        return f"Intent({self.kind!r}, language={self.language!r}, whole={self.whole}, query={self.query!r})"
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: every pattern occurrence in one left-to-right pass over the text."""
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+    def add(self, pattern, value):
+        node = 0
+        for ch in pattern:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            node = nxt
+        self.out[node].append((len(pattern), value))
+
+    def build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0) if node else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+        return self
+
+    def find(self, text):
+        """Yield (start, end, value) for every occurrence."""
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for length, value in self.out[node]:
+                yield i + 1 - length, i + 1, value
+
+
+def _is_word_char(ch):
+    # letters, digits and combining marks (Devanagari/Odia vowel signs) continue a word
+    return ch.isalnum() or unicodedata.category(ch).startswith("M")
+
+
+def _bounded(text, start, end):
+    return (start == 0 or not _is_word_char(text[start - 1])) and (end == len(text) or not _is_word_char(text[end]))
+
+
+def _build_matcher(index):
+    matcher = AhoCorasick()
+    for intent, words in KEYWORDS.items():
+        for word in words:
+            matcher.add(word.lower(), ("keyword", intent))
+    if index is None:
+        return matcher.build()
+    # Known names in English, plus every localized name the catalog has already built.
+    # Messages are lower-cased, so patterns are too; the value keeps the stored name.
+    names = {name.lower(): ("term", "disease", name) for name in index.disease_names.values()}
+    for alias, disease_id in index.aliases.items():
+        names.setdefault(alias, ("term", "disease", index.disease_names[disease_id]))
+    for name in index.symptom_names.values():
+        names.setdefault(name, ("term", "symptom", name))
+    for lang in catalog.SUPPORTED_LANGUAGES:
+        for english, localized in catalog.localized_terms(lang).items():
+            if english.lower() in names and localized:
+                names.setdefault(localized.lower(), names[english.lower()])
+    for pattern, value in names.items():
+        matcher.add(pattern, value)
+    return matcher.build()
+
+
+_matcher = None
+_matcher_key = None
+_lock = threading.Lock()
+
+
+def _invalidate(index):
+    global _matcher
+    with _lock:
+        _matcher = None
+
+
+knowledge.on_refresh(_invalidate)
+
+
+def get_matcher():
+    """The compiled matcher; rebuilt when the knowledge index or the localized catalog changes."""
+    global _matcher, _matcher_key
+    try:
+        index = get_index()
+    except Exception as e:
+        # keywords still work without the database; names come back once the index loads
+        print("Intent matcher without knowledge terms:", e)
+        index = None
+    key = (id(index) if index is not None else None, catalog.version())
+    if _matcher is None or _matcher_key != key:
+        with _lock:
+            if _matcher is None or _matcher_key != key:
+                _matcher = _build_matcher(index)
+                _matcher_key = key
+    return _matcher
+
+
+def _only(text, spans):
+    """True if nothing but punctuation and spaces is left of `text` outside `spans`."""
+    rest = list(text)
+    for start, end in spans:
+        rest[start:end] = " " * (end - start)
+    return not any(_is_word_char(ch) for ch in rest)
+
+
+def _resolve_terms(text, terms):
+    """English names for the comma-separated parts of `text`, or None unless every part is a known name."""
+    resolved = []
+    kinds = set()
+    offset = 0
+    for part in text.split(","):
+        stripped = part.strip()
+        start = offset + (len(part) - len(part.lstrip()))
+        offset += len(part) + 1
+        if not stripped:
+            continue
+        hit = terms.get((start, start + len(stripped)))
+        if hit is None:
+            return None, None
+        kinds.add(hit[1])
+        resolved.append(hit[2])
+    return resolved, kinds
+
+
+def classify(message):
+    """Classify a raw (lower-cased) message in any supported script with one pass of the matcher."""
+    text = message.strip()
+    keywords = {}
+    terms = {}
+    for start, end, value in get_matcher().find(text):
+        if not _bounded(text, start, end):
+            continue
+        if value[0] == "keyword":
+            keywords.setdefault(value[1], (start, end))
+        else:
+            terms.setdefault((start, end), value)
+
+    languages = [(span, intent.split(":", 1)[1]) for intent, span in keywords.items() if intent.startswith("language:")]
+    language = min(languages)[1] if languages else None
+    if "change_language" in keywords:
+        return Intent("change_language", language=language)
+    if "language_word" in keywords and _only(text, [keywords["language_word"]] + [span for span, _ in languages]):
+        return Intent("change_language", language=language)
+    if language:
+        whole = len(languages) == 1 and min(languages)[0] == (0, len(text))
+        return Intent("language", language=language, whole=whole)
+    if "vaccine_word" in keywords and "schedule_word" in keywords:
+        return Intent("vaccine", query="vaccine schedule")
+
+    resolved, kinds = _resolve_terms(text, terms)
+    if resolved:
+        if len(resolved) > 1:
+            return Intent("symptoms", query=", ".join(resolved))
+        return Intent("disease" if "disease" in kinds else "symptom", query=resolved[0])
+    return Intent("unknown")
@@ -0,0 +1,204 @@
+# knowledge.py
+import time
+import threading
+import snapshot
+from cache import LRUCache
+from db import normalize_word, _dedup_symptoms
+from repository import knowledge_rows, get_data_version
+from config import KNOWLEDGE_VERSION_CHECK, TERM_CACHE_SIZE
+
+
+class KnowledgeIndex:
+    """
+    Read-only, process-local copy of the diseases/symptoms/preventions tables.
+    Answers the same questions as repository.get_disease_info and
+    repository.get_diseases_by_multiple_symptoms without a DB round-trip.
+    """
+
+    def __init__(self, diseases, symptoms, links, preventions, aliases=(), variants=()):
+        # diseases / symptoms: iterable of (id, name); links: (disease_id, symptom_id);
+        # preventions: (disease_id, text) in prevention_id order;
+        # aliases: (alias_name, disease_id); variants: (variant_name, symptom_id)
+        self.disease_names = {}
+        self.by_name = {}
+        for disease_id, name in diseases:
+            self.disease_names[disease_id] = name
+            self.by_name.setdefault(normalize_word(name), disease_id)
+
+        self.aliases = {}
+        for alias, disease_id in aliases:
+            if disease_id in self.disease_names:
+                self.aliases[normalize_word(alias)] = disease_id
+                self.by_name.setdefault(normalize_word(alias), disease_id)
+
+        self.symptom_names = {}
+        for symptom_id, name in symptoms:
+            self.symptom_names[symptom_id] = normalize_word(name)
+
+        self.variants = {}
+        for variant, symptom_id in variants:
+            if symptom_id in self.symptom_names:
+                self.variants.setdefault(normalize_word(variant), []).append(symptom_id)
+
+        # inverted index: symptom_id -> disease_ids, plus the forward lists
+        self.postings = {}
+        self.disease_symptom_ids = {disease_id: [] for disease_id in self.disease_names}
+        for disease_id, symptom_id in links:
+            if disease_id not in self.disease_names or symptom_id not in self.symptom_names:
+                continue
+            if disease_id in self.postings.setdefault(symptom_id, []):
+                continue
+            self.postings[symptom_id].append(disease_id)
+            self.disease_symptom_ids[disease_id].append(symptom_id)
+
+        prevention_lists = {disease_id: [] for disease_id in self.disease_names}
+        for disease_id, text in preventions:
+            items = prevention_lists.get(disease_id)
+            if items is not None and text not in items:
+                items.append(text)
+        self.preventions = {d: tuple(items) for d, items in prevention_lists.items()}
+        self.prevention_text = {d: ",".join(items) or None for d, items in self.preventions.items()}
+
+        self.symptom_text = {
+            d: _dedup_symptoms(",".join(self.symptom_names[s] for s in ids)) or None
+            for d, ids in self.disease_symptom_ids.items()
+        }
+        # keyed by raw user terms, so bounded
+        self._term_cache = LRUCache(maxsize=TERM_CACHE_SIZE)
+        self._ranker = None
+        self._fuzzy = None
+
+    @property
+    def ranker(self):
+        if self._ranker is None:
+            from ranking import SymptomRanker
+            self._ranker = SymptomRanker(self)
+        return self._ranker
+
+    @classmethod
+    def load(cls):
+        snap = snapshot.current()
+        if snap is not None:
+            return cls(*snap.knowledge_rows())
+        return cls(*knowledge_rows())
+
+    def _row(self, disease_id):
+        return {
+            "disease": self.disease_names[disease_id],
+            "symptoms": self.symptom_text[disease_id],
+            "prevention": self.prevention_text[disease_id],
+        }
+
+    def _substring_matches(self, term):
+        found = {s for s, name in self.symptom_names.items() if term in name}
+        for variant, symptom_ids in self.variants.items():
+            if term in variant:
+                found.update(symptom_ids)
+        return found
+
+    def symptoms_matching(self, term):
+        """
+        Symptom ids whose name or a variant contains `term` (same rule as the SQL LIKE '%term%').
+        A term with no match is spell-corrected once (e.g. "jont pain" -> "joint pain").
+        """
+        ids = self._term_cache.get(term)
+        if ids is None:
+            found = self._substring_matches(term)
+            if not found:
+                corrected = self.fuzzy.correct(term)
+                if corrected != term:
+                    found = self._substring_matches(corrected)
+            ids = tuple(sorted(found))
+            self._term_cache.set(term, ids)
+        return ids
+
+    def disease_info(self, disease_name):
+        if not disease_name or not disease_name.strip():
+            return None
+        disease_id = self.by_name.get(normalize_word(disease_name))
+        if disease_id is None:
+            needle = disease_name.strip().lower()
+            disease_id = next((d for d, name in self.disease_names.items() if needle in name.lower()), None)
+        if disease_id is None:
+            disease_id = next((d for alias, d in self.aliases.items() if needle in alias), None)
+        if disease_id is None:
+            disease_id = self.by_name.get(self.fuzzy.correct(normalize_word(disease_name)))
+        if disease_id is None:
+            return None
+        return self._row(disease_id)
+
+    @property
+    def fuzzy(self):
+        """Typo-tolerant word index over every disease, alias, symptom and variant name."""
+        if self._fuzzy is None:
+            from fuzzy import FuzzyIndex
+            vocabulary = list(self.by_name) + list(self.symptom_names.values()) + list(self.variants)
+            self._fuzzy = FuzzyIndex(vocabulary)
+        return self._fuzzy
+
+    def ranked_diseases(self, symptoms, k):
+        """Top-k diseases by IDF-weighted symptom score (see ranking.SymptomRanker)."""
+        return self.ranker.rank(symptoms, k)
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+_checked_at = 0.0
+_listeners = []
+
+
+def on_refresh(callback):
+    """Register callback(index) to run after every rebuild (e.g. to drop derived caches)."""
+    _listeners.append(callback)
+
+
+def get_index():
+    """
+    Return the shared index, building it on first use from the knowledge snapshot if one is
+    configured, else from MySQL. Every KNOWLEDGE_VERSION_CHECK seconds the data_version marker
+    (the snapshot's, or the table's) is re-read and the index is rebuilt if seed/sync changed it.
+    """
+    global _checked_at
+    if _index is None:
+        return refresh(_read_version())
+    if KNOWLEDGE_VERSION_CHECK and time.monotonic() - _checked_at >= KNOWLEDGE_VERSION_CHECK:
+        _checked_at = time.monotonic()
+        return ensure_version(_read_version())
+    return _index
+
+
+def _read_version():
+    snap = snapshot.current()
+    if snap is not None:
+        return snap.version
+    try:
+        return get_data_version()
+    except Exception as e:
+        print("Could not read data version:", e)
+        return _index_version
+
+
+def refresh(version=None):
+    """Rebuild the index (snapshot or MySQL) and swap it in atomically."""
+    global _index, _index_version, _checked_at
+    with _index_lock:
+        index = KnowledgeIndex.load()
+        _index = index
+        _index_version = version
+        _checked_at = time.monotonic()
+    for callback in _listeners:
+        callback(index)
+    return index
+
+
+def index_version():
+    """data_version the current index was built from (None before the first load)."""
+    return _index_version
+
+
+def ensure_version(version):
+    """Rebuild only if `version` differs from the one the current index was built for."""
+    if _index is None or version != _index_version:
+        return refresh(version)
+    return _index
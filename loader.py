@@ -0,0 +1,156 @@
+# loader.py
+import os
+import csv
+import sys
+import json
+import time
+import datetime
+from db import connect_db, normalize_word, _generate_variants, _symptom_tokens
+from cases import add_cases
+from repository import resolve_ids
+
+DEFAULT_DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "seed.json")
+BATCH_SIZE = 1000
+
+
+def _chunks(items, size):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _read_csv(path):
+    if not os.path.exists(path):
+        return
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield row
+
+
+def read_dataset(path=DEFAULT_DATASET):
+    """
+    Load a dataset from a JSON file (same shape as data/seed.json) or from a directory of CSVs:
+    - diseases.csv: disease,cases
+    - disease_symptoms.csv: disease,symptom
+    - preventions.csv: disease,prevention
+    - aliases.csv: alias,disease
+    - symptom_variants.csv: symptom,variant
+    """
+    if not os.path.isdir(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    diseases = {}
+
+    def entry(name):
+        return diseases.setdefault(name, {"symptoms": [], "preventions": [], "cases": 0})
+
+    for row in _read_csv(os.path.join(path, "diseases.csv")):
+        entry(row["disease"])["cases"] = int(row.get("cases") or 0)
+    for row in _read_csv(os.path.join(path, "disease_symptoms.csv")):
+        entry(row["disease"])["symptoms"].append(row["symptom"])
+    for row in _read_csv(os.path.join(path, "preventions.csv")):
+        entry(row["disease"])["preventions"].append(row["prevention"])
+
+    aliases = {}
+    for row in _read_csv(os.path.join(path, "aliases.csv")):
+        aliases.setdefault(row["disease"], []).append(row["alias"])
+    variants = {}
+    for row in _read_csv(os.path.join(path, "symptom_variants.csv")):
+        variants.setdefault(row["symptom"], []).append(row["variant"])
+
+    return {"diseases": diseases, "aliases": aliases, "symptom_variants": variants}
+
+
+def normalize_dataset(dataset):
+    """
+    Returns (diseases, aliases, links, variants) with every name normalized:
+    - diseases: name -> details (symptoms, preventions, cases)
+    - aliases: alias -> canonical disease name
+    - links: set of (disease, symptom) for canonical symptoms only
+    - variants: set of (variant, symptom) for the curated symptom variants
+    """
+    diseases = {normalize_word(name): details for name, details in dataset["diseases"].items()}
+    variants_map = {
+        normalize_word(k): [normalize_word(v) for v in vals]
+        for k, vals in dataset.get("symptom_variants", {}).items()
+    }
+    links = set()
+    variants = set()
+    for name, details in diseases.items():
+        for symptom in details.get("symptoms", []):
+            base = normalize_word(symptom)
+            links.add((name, base))
+            for variant in _generate_variants(symptom, variants_map) - {base}:
+                variants.add((variant, base))
+
+    aliases = {}
+    for canonical, names in dataset.get("aliases", {}).items():
+        for alias in names:
+            if normalize_word(canonical) in diseases:
+                aliases[normalize_word(alias)] = normalize_word(canonical)
+    return diseases, aliases, links, variants
+
+
+def _insert_many(conn, cursor, query, rows, batch_size):
+    """executemany in batches (multi-row INSERTs), one commit per batch."""
+    count = 0
+    for chunk in _chunks(rows, batch_size):
+        cursor.executemany(query, chunk)
+        conn.commit()
+        count += len(chunk)
+    return count
+
+
+def load_dataset(dataset, conn=None, batch_size=BATCH_SIZE, case_date=None):
+    """
+    Bulk-load a dataset into the existing tables and return the number of rows written.
+    Names are normalized exactly like the old row-by-row seeding did.
+    """
+    own_conn = conn is None
+    conn = conn or connect_db()
+    cursor = conn.cursor()
+    start = time.monotonic()
+    case_date = case_date or datetime.date.today()
+
+    diseases, aliases, links, variants = normalize_dataset(dataset)
+    symptom_names = sorted({s for _, s in links})
+
+    rows = 0
+    rows += _insert_many(conn, cursor, "INSERT IGNORE INTO diseases (disease_name) VALUES (%s)",
+                         [(d,) for d in diseases], batch_size)
+    rows += _insert_many(conn, cursor, "INSERT IGNORE INTO symptoms (symptom_name) VALUES (%s)",
+                         [(s,) for s in symptom_names], batch_size)
+
+    disease_ids = resolve_ids(conn, "diseases", "disease_id", "disease_name", list(diseases), batch_size)
+    symptom_ids = resolve_ids(conn, "symptoms", "symptom_id", "symptom_name", symptom_names, batch_size)
+
+    rows += _insert_many(conn, cursor, "INSERT IGNORE INTO symptom_tokens (token, symptom_id) VALUES (%s, %s)",
+                         [(t, symptom_ids[s]) for s in symptom_names for t in _symptom_tokens(s)], batch_size)
+    rows += _insert_many(conn, cursor, "INSERT IGNORE INTO disease_symptoms (disease_id, symptom_id) VALUES (%s, %s)",
+                         sorted((disease_ids[d], symptom_ids[s]) for d, s in links), batch_size)
+    rows += _insert_many(conn, cursor, "INSERT IGNORE INTO symptom_variants (variant_name, symptom_id) VALUES (%s, %s)",
+                         sorted((v, symptom_ids[s]) for v, s in variants), batch_size)
+    rows += _insert_many(conn, cursor, "INSERT IGNORE INTO disease_aliases (alias_name, disease_id) VALUES (%s, %s)",
+                         sorted((a, disease_ids[c]) for a, c in aliases.items()), batch_size)
+    rows += _insert_many(conn, cursor, "INSERT IGNORE INTO preventions (disease_id, prevention_text) VALUES (%s, %s)",
+                         [(disease_ids[d], p.strip()) for d, details in diseases.items()
+                          for p in details.get("preventions", [])], batch_size)
+    for chunk in _chunks([(disease_ids[d], case_date, details["cases"]) for d, details in diseases.items()
+                          if details.get("cases")], batch_size):
+        rows += add_cases(chunk, conn=conn)
+
+    elapsed = time.monotonic() - start
+    print(f"Loaded {rows} rows in {elapsed:.2f}s ({rows / elapsed if elapsed else rows:.0f} rows/sec)")
+
+    cursor.close()
+    if own_conn:
+        conn.close()
+    return rows
+
+
+if __name__ == "__main__":
+    # Append a dataset to the existing tables: python loader.py [path] [batch_size]
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DATASET
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else BATCH_SIZE
+    load_dataset(read_dataset(path), batch_size=batch)
@@ -0,0 +1,192 @@
+# metrics.py
+import sys
+import time
+import threading
+from functools import wraps
+from contextlib import contextmanager
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_help = {}
+_counters = {}    # (name, labels) -> value
+_histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+_collectors = []  # callables returning [(name, labels dict, value)] gauges at scrape time
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def describe(name, text):
+    _help[name] = text
+
+
+def inc(name, value=1, **labels):
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    key = (name, _labels(labels))
+    with _lock:
+        data = _histograms.get(key)
+        if data is None:
+            data = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                data[i] += 1
+        data[-2] += value
+        data[-1] += 1
+
+
+@contextmanager
+def span(stage):
+    """Time one stage of request handling into stage_seconds{stage=...}."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe("stage_seconds", time.perf_counter() - start, stage=stage)
+
+
+def timed(func):
+    """Record every call of `func` into db_query_seconds{query=<function name>} (errors counted too)."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            inc("db_query_errors_total", query=func.__name__)
+            raise
+        finally:
+            observe("db_query_seconds", time.perf_counter() - start, query=func.__name__)
+    return wrapper
+
+
+def register_collector(collect):
+    """`collect()` -> [(name, labels dict, value)]; called on every scrape for point-in-time gauges."""
+    _collectors.append(collect)
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    typed = set()
+
+    def header(name, kind):
+        if name in typed:
+            return
+        typed.add(name)
+        if name in _help:
+            lines.append(f"# HELP {name} {_help[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, list(data)) for key, data in _histograms.items())
+
+    for (name, labels), value in counters:
+        header(name, "counter")
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+    for (name, labels), data in histograms:
+        header(name, "histogram")
+        for i, bound in enumerate(BUCKETS):
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {data[i]}")
+        lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {data[-1]}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {data[-2]:.6f}")
+        lines.append(f"{name}_count{_format_labels(labels)} {data[-1]}")
+    for collect in _collectors:
+        try:
+            gauges = collect()
+        except Exception as e:
+            print("Metrics collector failed:", e)
+            continue
+        for name, labels, value in gauges:
+            header(name, "gauge")
+            lines.append(f"{name}{_format_labels(_labels(labels))} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+class SamplingProfiler:
+    """
+    Low-overhead wall-clock profiler: a daemon thread snapshots every other thread's stack
+    (sys._current_frames) every `interval` seconds and counts identical stacks.
+    report() returns collapsed stacks ("file:func;file:func count") ready for flamegraph tools.
+    """
+
+    def __init__(self, interval=0.005, max_depth=40):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = {}
+        self._samples_lock = threading.Lock()  # report() copies while _run() counts
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def clear(self):
+        with self._samples_lock:
+            self.samples = {}
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}")
+                    frame = frame.f_back
+                key = ";".join(reversed(stack))
+                with self._samples_lock:
+                    self.samples[key] = self.samples.get(key, 0) + 1
+
+    def report(self, top=None):
+        with self._samples_lock:
+            samples = list(self.samples.items())
+        ranked = sorted(samples, key=lambda item: -item[1])
+        if top:
+            ranked = ranked[:top]
+        return "\n".join(f"{stack} {count}" for stack, count in ranked) + "\n"
+
+
+profiler = SamplingProfiler()
+
+describe("stage_seconds", "Time spent in each stage of webhook handling.")
+describe("db_query_seconds", "Latency of db.py query helpers.")
+describe("db_query_errors_total", "db.py query helper calls that raised.")
+describe("webhook_requests_total", "Webhook requests by outcome.")
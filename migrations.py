@@ -0,0 +1,342 @@
+# migrations.py
+# Versioned schema changes. Every migration runs once, in order, and is recorded in
+# schema_migrations; add new ones to the end of MIGRATIONS and never edit applied ones.
+#   python migrations.py          # apply pending migrations
+#   python migrations.py status   # list applied/pending
+#   python migrations.py check    # EXPLAIN every db.py query and report index problems
+import sys
+import datetime
+from db import connect_db
+
+
+def _index_exists(cursor, table, index):
+    cursor.execute(
+        "SELECT 1 FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s LIMIT 1",
+        (table, index)
+    )
+    return cursor.fetchone() is not None
+
+
+def _column_exists(cursor, table, column):
+    cursor.execute(
+        "SELECT 1 FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s LIMIT 1",
+        (table, column)
+    )
+    return cursor.fetchone() is not None
+
+
+def _add_index(cursor, table, index, definition):
+    if not _index_exists(cursor, table, index):
+        cursor.execute(f"ALTER TABLE {table} ADD {definition}")
+
+
+def _m001_baseline(cursor):
+    """Tables as they existed before migrations; IF NOT EXISTS so older databases adopt them as-is."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS diseases (
+            disease_id INT AUTO_INCREMENT PRIMARY KEY,
+            disease_name VARCHAR(100) UNIQUE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS symptoms (
+            symptom_id INT AUTO_INCREMENT PRIMARY KEY,
+            symptom_name VARCHAR(100) UNIQUE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS symptom_tokens (
+            token VARCHAR(100),
+            symptom_id INT,
+            PRIMARY KEY (token, symptom_id),
+            FOREIGN KEY (symptom_id) REFERENCES symptoms(symptom_id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS disease_aliases (
+            alias_name VARCHAR(100) PRIMARY KEY,
+            disease_id INT,
+            FOREIGN KEY (disease_id) REFERENCES diseases(disease_id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS symptom_variants (
+            variant_name VARCHAR(100),
+            symptom_id INT,
+            PRIMARY KEY (variant_name, symptom_id),
+            FOREIGN KEY (symptom_id) REFERENCES symptoms(symptom_id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS disease_symptoms (
+            disease_id INT,
+            symptom_id INT,
+            FOREIGN KEY (disease_id) REFERENCES diseases(disease_id) ON DELETE CASCADE,
+            FOREIGN KEY (symptom_id) REFERENCES symptoms(symptom_id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS preventions (
+            prevention_id INT AUTO_INCREMENT PRIMARY KEY,
+            disease_id INT,
+            prevention_text VARCHAR(255),
+            FOREIGN KEY (disease_id) REFERENCES diseases(disease_id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS cases (
+            case_id INT AUTO_INCREMENT PRIMARY KEY,
+            disease_id INT,
+            case_date DATE,
+            num_cases INT,
+            FOREIGN KEY (disease_id) REFERENCES diseases(disease_id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS case_daily_summary (
+            summary_date DATE,
+            disease_id INT,
+            total_cases INT,
+            PRIMARY KEY (summary_date, disease_id),
+            FOREIGN KEY (disease_id) REFERENCES diseases(disease_id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS case_rollups (
+            period VARCHAR(5),
+            period_start DATE,
+            disease_id INT,
+            total_cases INT,
+            PRIMARY KEY (period, period_start, disease_id),
+            FOREIGN KEY (disease_id) REFERENCES diseases(disease_id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_sessions (
+            sender VARCHAR(64) PRIMARY KEY,
+            data VARCHAR(1024),
+            expires_at DOUBLE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS subscribers (
+            subscriber_id INT AUTO_INCREMENT PRIMARY KEY,
+            phone VARCHAR(32) UNIQUE,
+            language VARCHAR(8),
+            active TINYINT DEFAULT 1
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS broadcast_progress (
+            broadcast_id VARCHAR(64) PRIMARY KEY,
+            last_subscriber_id INT,
+            sent INT,
+            failed INT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS data_meta (
+            meta_key VARCHAR(64) PRIMARY KEY,
+            meta_value BIGINT
+        )
+    """)
+
+
+def _m002_disease_symptoms_key(cursor):
+    """
+    (disease_id, symptom_id) primary key so INSERT IGNORE really deduplicates, plus the reverse
+    (symptom_id, disease_id) index for symptom -> disease joins. Rebuilt through a copy because
+    existing duplicate rows would make ADD PRIMARY KEY fail.
+    """
+    if _index_exists(cursor, "disease_symptoms", "PRIMARY"):
+        _add_index(cursor, "disease_symptoms", "idx_ds_symptom_disease",
+                   "INDEX idx_ds_symptom_disease (symptom_id, disease_id)")
+        return
+    cursor.execute("DROP TABLE IF EXISTS disease_symptoms_new")
+    cursor.execute("""
+        CREATE TABLE disease_symptoms_new (
+            disease_id INT NOT NULL,
+            symptom_id INT NOT NULL,
+            PRIMARY KEY (disease_id, symptom_id),
+            INDEX idx_ds_symptom_disease (symptom_id, disease_id),
+            FOREIGN KEY (disease_id) REFERENCES diseases(disease_id) ON DELETE CASCADE,
+            FOREIGN KEY (symptom_id) REFERENCES symptoms(symptom_id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        INSERT IGNORE INTO disease_symptoms_new (disease_id, symptom_id)
+        SELECT disease_id, symptom_id FROM disease_symptoms
+        WHERE disease_id IS NOT NULL AND symptom_id IS NOT NULL
+    """)
+    cursor.execute("RENAME TABLE disease_symptoms TO disease_symptoms_old, disease_symptoms_new TO disease_symptoms")
+    cursor.execute("DROP TABLE disease_symptoms_old")
+
+
+def _m003_preventions_unique(cursor):
+    """Drop duplicate (disease, text) rows, then enforce uniqueness; the key also covers the GROUP_CONCAT."""
+    cursor.execute("""
+        DELETE p1 FROM preventions p1
+        JOIN preventions p2
+          ON p1.disease_id = p2.disease_id
+         AND p1.prevention_text = p2.prevention_text
+         AND p1.prevention_id > p2.prevention_id
+    """)
+    _add_index(cursor, "preventions", "uq_preventions_disease_text",
+               "UNIQUE KEY uq_preventions_disease_text (disease_id, prevention_text)")
+
+
+def _m004_cases_indexes(cursor):
+    """District column and the date-first indexes used by alerts, ingestion and rollup rebuilds."""
+    if not _column_exists(cursor, "cases", "district"):
+        cursor.execute("ALTER TABLE cases ADD COLUMN district VARCHAR(100) DEFAULT NULL")
+    _add_index(cursor, "cases", "idx_cases_date_disease", "INDEX idx_cases_date_disease (case_date, disease_id)")
+    _add_index(cursor, "cases", "idx_cases_district_date", "INDEX idx_cases_district_date (district, case_date)")
+
+
+def _m005_backfill_case_summaries(cursor):
+    """Fill case_daily_summary and case_rollups from case history recorded before they existed."""
+    from cases import rebuild_summary_tables
+    rebuild_summary_tables(cursor)
+
+
+MIGRATIONS = [
+    (1, "baseline tables", _m001_baseline),
+    (2, "disease_symptoms primary key and reverse index", _m002_disease_symptoms_key),
+    (3, "unique preventions per disease", _m003_preventions_unique),
+    (4, "cases district column and date indexes", _m004_cases_indexes),
+    (5, "backfill daily case summary and rollups", _m005_backfill_case_summaries),
+]
+
+# Tables holding the seeded knowledge (and its case history); emptied by db.seed_database
+DATA_TABLES = [
+    "case_rollups", "case_daily_summary", "cases", "symptom_tokens", "symptom_variants",
+    "disease_aliases", "disease_symptoms", "preventions", "symptoms", "diseases",
+]
+
+
+def _ensure_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255),
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(cursor):
+    _ensure_table(cursor)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def migrate(conn=None):
+    """Apply every pending migration in order; returns the versions applied."""
+    own_conn = conn is None
+    conn = conn or connect_db()
+    cursor = conn.cursor()
+    done = applied_versions(cursor)
+
+    applied = []
+    for version, description, migration in MIGRATIONS:
+        if version in done:
+            continue
+        print(f"Applying migration {version}: {description}")
+        migration(cursor)
+        cursor.execute(
+            "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+            (version, description)
+        )
+        conn.commit()
+        applied.append(version)
+
+    cursor.close()
+    if own_conn:
+        conn.close()
+    return applied
+
+
+def clear_data(cursor):
+    """Empty the knowledge and case tables (schema stays); used before a full reseed."""
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    try:
+        for table in DATA_TABLES:
+            cursor.execute(f"TRUNCATE TABLE {table}")
+    finally:
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+
+
+def _plan_queries():
+    """(name, query, params, tables allowed to be scanned) for every query db.py issues."""
+    import db
+    today = datetime.date.today()
+    queries = []
+    for mode in ("indexed", "substring"):
+        # '%term%' cannot use an index, so substring mode may scan the name tables
+        scans = set() if mode == "indexed" else {"diseases", "disease_aliases", "symptoms", "symptom_variants"}
+        queries += [
+            (f"get_disease_info[{mode}]", *db._disease_info_query("fever", mode), scans),
+            (f"get_disease_by_symptom[{mode}]", *db._symptom_query("cough", mode), scans),
+            (f"get_today_alert[{mode}]", *db._today_alert_query("fever", today, mode), scans),
+            (f"get_diseases_by_multiple_symptoms[{mode}]",
+             *db._multi_symptom_query(["cough", "fever", "headache"], mode, 10), scans),
+        ]
+    queries += [
+        ("get_all_diseases", db.ALL_DISEASES_QUERY, [], {"diseases"}),
+        ("get_data_version", db.DATA_VERSION_QUERY, [], set()),
+    ]
+    return queries
+
+
+def verify_query_plans(conn=None):
+    """
+    EXPLAIN every db.py query and return a list of problems: full table scans outside the
+    tables a query is allowed to scan, and joins that fall back to a join buffer (no usable index).
+    Run it against a realistically sized database (e.g. after `python -m bench.run`); on a
+    handful of rows MySQL may prefer a scan even when the right index exists.
+    """
+    own_conn = conn is None
+    conn = conn or connect_db()
+    cursor = conn.cursor(dictionary=True)
+
+    problems = []
+    for name, query, params, scans in _plan_queries():
+        cursor.execute("EXPLAIN " + query, params)
+        for row in cursor.fetchall():
+            table = row.get("table") or ""
+            extra = row.get("Extra") or ""
+            if table.startswith("<"):
+                continue  # derived/union temp tables
+            if row.get("type") == "ALL" and table not in scans:
+                problems.append(f"{name}: full scan of {table} (~{row.get('rows')} rows)")
+            if "join buffer" in extra.lower():
+                problems.append(f"{name}: join on {table} without an index ({extra})")
+
+    cursor.close()
+    if own_conn:
+        conn.close()
+    return problems
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "migrate"
+    if command == "status":
+        conn = connect_db()
+        cursor = conn.cursor()
+        done = applied_versions(cursor)
+        cursor.close()
+        conn.close()
+        for version, description, _ in MIGRATIONS:
+            print(f"{version:>4}  {'applied' if version in done else 'pending':<8} {description}")
+    elif command == "check":
+        problems = verify_query_plans()
+        for problem in problems:
+            print("✗", problem)
+        print("All query plans use indexes." if not problems else f"{len(problems)} query plan problem(s).")
+        sys.exit(1 if problems else 0)
+    else:
+        applied = migrate()
+        print(f"Applied {len(applied)} migration(s)." if applied else "Schema is up to date.")
@@ -0,0 +1,149 @@
+# pipeline.py
+import time
+import queue
+import threading
+import zlib
+
+
+class Job:
+    __slots__ = ("sender", "body", "enqueued_at")
+
+    def __init__(self, sender, body):
+        self.sender = sender
+        self.body = body
+        self.enqueued_at = time.monotonic()
+
+
+class InProcessQueue:
+    """
+    Default backend: one bounded queue + worker thread per shard.
+    A sender always hashes to the same shard, so its messages are handled in order,
+    and the shard count caps how many replies are computed concurrently.
+    """
+
+    def __init__(self, workers=4, maxsize=1000):
+        self._queues = [queue.Queue(maxsize) for _ in range(workers)]
+        self._threads = []
+        self._handler = None
+
+    def start(self, handler):
+        self._handler = handler
+        for q in self._queues:
+            t = threading.Thread(target=self._run, args=(q,), daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def _run(self, q):
+        while True:
+            job = q.get()
+            if job is None:
+                break
+            self._handler(job)
+
+    def put(self, job):
+        """Raises queue.Full when the sender's shard is saturated."""
+        shard = zlib.crc32(job.sender.encode("utf-8")) % len(self._queues)
+        self._queues[shard].put_nowait(job)
+
+    def stop(self):
+        for q in self._queues:
+            q.put(None)
+        for t in self._threads:
+            t.join()
+        self._threads = []
+
+
+class LocalBrokerQueue:
+    """
+    Broker stand-in for tests: jobs are held until drain() runs them in arrival order,
+    so a test can inspect what was enqueued before anything is sent.
+    """
+
+    def __init__(self):
+        self.jobs = []
+        self._handler = None
+
+    def start(self, handler):
+        self._handler = handler
+
+    def put(self, job):
+        self.jobs.append(job)
+
+    def drain(self):
+        jobs, self.jobs = self.jobs, []
+        for job in jobs:
+            self._handler(job)
+        return len(jobs)
+
+    def stop(self):
+        pass
+
+
+class Pipeline:
+    """Accept a message now, compute and deliver the reply later on the queue backend."""
+
+    def __init__(self, backend, compute, send):
+        self.backend = backend
+        self.compute = compute
+        self.send = send
+        self._started = False
+        self._lock = threading.Lock()
+        self._stats = {
+            "enqueued": 0,
+            "rejected": 0,
+            "processed": 0,
+            "failed": 0,
+            "queue_wait_seconds": 0.0,
+            "compute_seconds": 0.0,
+            "send_seconds": 0.0,
+            "max_total_seconds": 0.0,
+        }
+
+    def _ensure_started(self):
+        if not self._started:
+            with self._lock:
+                if not self._started:
+                    self.backend.start(self._process)
+                    self._started = True
+
+    def submit(self, sender, body):
+        """Enqueue a message; returns False if the backend has no room for it."""
+        self._ensure_started()
+        try:
+            self.backend.put(Job(sender, body))
+        except queue.Full:
+            with self._lock:
+                self._stats["rejected"] += 1
+            return False
+        with self._lock:
+            self._stats["enqueued"] += 1
+        return True
+
+    def _process(self, job):
+        started = time.monotonic()
+        try:
+            reply = self.compute(job.sender, job.body)
+            computed = time.monotonic()
+            if reply:
+                self.send(job.sender, reply)
+        except Exception as e:
+            print("Pipeline job failed:", job.sender, e)
+            with self._lock:
+                self._stats["failed"] += 1
+            return
+        finished = time.monotonic()
+        with self._lock:
+            self._stats["processed"] += 1
+            self._stats["queue_wait_seconds"] += started - job.enqueued_at
+            self._stats["compute_seconds"] += computed - started
+            self._stats["send_seconds"] += finished - computed
+            self._stats["max_total_seconds"] = max(self._stats["max_total_seconds"], finished - job.enqueued_at)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def stop(self):
+        if self._started:
+            self.backend.stop()
+            self._started = False
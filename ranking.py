@@ -0,0 +1,90 @@
+# ranking.py
+import math
+import heapq
+from db import normalize_word, _dedup_symptoms
+
+# How much of a symptom's weight a query term earns, by how the term matched it
+EXACT_MATCH = 1.0
+VARIANT_MATCH = 0.6
+PARTIAL_MATCH = 0.3
+
+
+class SymptomRanker:
+    """
+    Scores diseases for a list of symptom terms using the knowledge index:
+    - each symptom is weighted by its specificity (IDF over disease_symptoms)
+    - a disease earns, per query term, the weight of its best matching symptom; a term equal to
+      the symptom name counts fully, a curated variant less and a mere substring least
+    - the sum is scaled by how much of the disease's own symptom weight was covered (with the
+      same match discount)
+    Per-disease symptom sets are kept as int bitsets so overlap counts are a single AND + popcount.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        n = len(index.disease_names)
+        self.idf = {
+            symptom_id: math.log((1 + n) / (1 + len(diseases))) + 1.0
+            for symptom_id, diseases in index.postings.items()
+        }
+        self.bit = {symptom_id: 1 << i for i, symptom_id in enumerate(sorted(index.symptom_names))}
+        self.disease_bits = {}
+        self.disease_weight = {}
+        for disease_id, symptom_ids in index.disease_symptom_ids.items():
+            bits = 0
+            for symptom_id in symptom_ids:
+                bits |= self.bit[symptom_id]
+            self.disease_bits[disease_id] = bits
+            self.disease_weight[disease_id] = sum(self.idf.get(s, 0.0) for s in symptom_ids)
+
+    def rank(self, symptoms, k):
+        """Top `k` rows (highest score first), shaped like repository.get_diseases_by_multiple_symptoms."""
+        normalized = [normalize_word(s) for s in symptoms if s.strip()]
+        if not normalized:
+            return []
+
+        postings = self.index.postings
+        scores = {}
+        credit = {}  # symptom_id -> best match quality any term gave it
+        query_bits = 0
+        for term in dict.fromkeys(normalized):
+            best = {}
+            variant_ids = self.index.variants.get(term, ())
+            for symptom_id in self.index.symptoms_matching(term):
+                query_bits |= self.bit[symptom_id]
+                if self.index.symptom_names[symptom_id] == term:
+                    quality = EXACT_MATCH
+                elif symptom_id in variant_ids:
+                    quality = VARIANT_MATCH
+                else:
+                    quality = PARTIAL_MATCH
+                credit[symptom_id] = max(quality, credit.get(symptom_id, 0.0))
+                weight = self.idf.get(symptom_id, 0.0) * quality
+                for disease_id in postings.get(symptom_id, ()):
+                    if weight > best.get(disease_id, 0.0):
+                        best[disease_id] = weight
+            for disease_id, weight in best.items():
+                scores[disease_id] = scores.get(disease_id, 0.0) + weight
+
+        ranked = []
+        for disease_id, raw in scores.items():
+            overlap = self.disease_bits[disease_id] & query_bits
+            covered = sum(self.idf[s] * credit[s] for s in self.index.disease_symptom_ids[disease_id]
+                          if self.bit[s] & overlap)
+            total = self.disease_weight[disease_id] or 1.0
+            ranked.append((raw * (0.5 + 0.5 * covered / total), overlap.bit_count(), -disease_id))
+
+        results = []
+        for score, matched, neg_id in heapq.nlargest(k, ranked):
+            disease_id = -neg_id
+            overlap = self.disease_bits[disease_id] & query_bits
+            names = [self.index.symptom_names[s] for s in self.index.disease_symptom_ids[disease_id]
+                     if self.bit[s] & overlap]
+            results.append({
+                "disease": self.index.disease_names[disease_id],
+                "symptoms": _dedup_symptoms(",".join(names)),
+                "prevention": self.index.prevention_text[disease_id],
+                "matched_symptoms": matched,
+                "score": round(score, 4),
+            })
+        return results
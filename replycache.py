@@ -0,0 +1,82 @@
+# replycache.py
+import time
+import threading
+import knowledge
+import catalog
+from cache import LRUCache
+from db import normalize_word
+from repository import get_data_version
+from config import REPLY_CACHE_SIZE, REPLY_CACHE_TTL, REPLY_NEGATIVE_TTL, LOOKUP_BACKEND, KNOWLEDGE_VERSION_CHECK
+
+# key -> reply text, or (catalog_key,) for a "nothing found" reply that is re-rendered per message
+_replies = LRUCache(REPLY_CACHE_SIZE, REPLY_CACHE_TTL)
+_lock = threading.Lock()
+_version = None
+_checked_at = 0.0
+
+
+def _data_version():
+    """
+    Version of the knowledge tables the cached replies were built from.
+    With the in-memory index this is the version the index was loaded for; with the db
+    backend the data_version marker is re-read every KNOWLEDGE_VERSION_CHECK seconds.
+    """
+    global _version, _checked_at
+    if LOOKUP_BACKEND != "db":
+        knowledge.get_index()
+        version = knowledge.index_version()
+    else:
+        version = _version
+        if version is None or time.monotonic() - _checked_at >= KNOWLEDGE_VERSION_CHECK:
+            _checked_at = time.monotonic()
+            try:
+                version = get_data_version()
+            except Exception as e:
+                print("Could not read data version:", e)
+    with _lock:
+        if version != _version:
+            _version = version
+            _replies.clear()
+    return version
+
+
+def key(incoming_msg, lang):
+    """(terms, lang, data version); symptom lists are order-insensitive ("cough, fever" == "fever, cough")."""
+    if "," in incoming_msg:
+        terms = tuple(sorted({normalize_word(t) for t in incoming_msg.split(",") if t.strip()}))
+        terms = ("multi",) + terms
+    else:
+        terms = (normalize_word(incoming_msg),)
+    return terms, lang, _data_version()
+
+
+def get(cache_key, incoming_msg):
+    """The cached reply for `cache_key`, or None. Negative entries are rendered for this message."""
+    cached = _replies.get(cache_key)
+    if isinstance(cached, tuple):
+        return catalog.render(cached[0], cache_key[1], incoming_msg)
+    return cached
+
+
+def put(cache_key, reply, miss_key=None):
+    """
+    Remember a reply under the key computed *before* answering, so a reply built from data that
+    changed meanwhile lands under the old version and is never served.
+    `miss_key` marks a "nothing found" reply (the catalog key that renders it); those are kept
+    for REPLY_NEGATIVE_TTL only, so newly added data shows up sooner.
+    """
+    if miss_key:
+        _replies.set(cache_key, (miss_key,), ttl=REPLY_NEGATIVE_TTL)
+    else:
+        _replies.set(cache_key, reply)
+
+
+def clear(index=None):
+    _replies.clear()
+
+
+def stats():
+    return _replies.stats()
+
+
+knowledge.on_refresh(clear)
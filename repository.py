@@ -0,0 +1,274 @@
+# repository.py
+# Read queries behind lookups, alerts and the knowledge index. SQL shapes come from db.py's
+# builders; every shape is executed through a server-side prepared statement cached on the
+# pooled connection, and rows come back as small __slots__ objects instead of per-row dicts.
+# Session, broadcast, rollup and sync reads stay in their own modules next to their writes.
+from metrics import timed
+from db import (
+    connect_db, normalize_word, _dedup_symptoms, _match_modes,
+    _disease_info_query, _symptom_query, _today_alert_query, _multi_symptom_query,
+    ALL_DISEASES_QUERY, DATA_VERSION_QUERY,
+)
+
+
+class Row:
+    """Positional row with attribute access; also readable like the dict rows it replaces."""
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def keys(self):
+        return self.__slots__
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.as_dict()!r})"
+
+
+class DiseaseName(Row):
+    __slots__ = ("disease",)
+
+
+class DiseaseInfo(Row):
+    __slots__ = ("disease", "symptoms", "prevention")
+
+
+class DiseaseMatch(Row):
+    __slots__ = ("disease", "symptoms", "prevention", "matched_symptoms")
+
+
+class CaseAlert(Row):
+    __slots__ = ("disease", "cases", "date")
+
+
+def _text(value):
+    # GROUP_CONCAT can come back as a BLOB type over the binary protocol
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8")
+    return value
+
+
+# handle no longer exists server-side / the session it lived in is gone
+_STALE_STATEMENT = {1243}  # ER_UNKNOWN_STMT_HANDLER
+_CONNECTION_LOST = {2006, 2013, 2055}  # CR_SERVER_GONE_ERROR, CR_SERVER_LOST, CR_SERVER_LOST_EXTENDED
+
+
+def _prepared(conn, statement):
+    # prepared once per pooled connection and reused by every later checkout of it
+    cursors = conn.statements
+    cursor = cursors.get(statement)
+    if cursor is None:
+        cursor = cursors[statement] = conn.cursor(prepared=True)
+    return cursor
+
+
+def _execute(conn, statement, params):
+    cursor = _prepared(conn, statement)
+    cursor.execute(statement, tuple(params))
+    return cursor.fetchall()
+
+
+def _fetch(conn, statement, params=()):
+    """Rows (tuples) for one statement; a stale handle (reconnect, server restart) is re-prepared once."""
+    from mysql.connector.errors import Error
+    try:
+        return _execute(conn, statement, params)
+    except Error as e:
+        if e.errno in _CONNECTION_LOST:
+            conn.reconnect(attempts=2, delay=0)
+        elif e.errno not in _STALE_STATEMENT:
+            raise
+    conn.statements.clear()
+    return _execute(conn, statement, params)
+
+
+def _fetch_rows(statement, params=()):
+    conn = connect_db()
+    try:
+        return _fetch(conn, statement, params)
+    finally:
+        conn.close()
+
+
+def _bucket(n):
+    """Smallest power of two >= n: variable-arity queries compile to a handful of shapes."""
+    size = 1
+    while size < n:
+        size *= 2
+    return size
+
+
+def _pad(items, size):
+    # Repeating the last term does not change a UNION / IN (...) result
+    return list(items) + [items[-1]] * (size - len(items))
+
+
+def _query(statement, params, row_cls, conn=None):
+    own_conn = conn is None
+    conn = conn or connect_db()
+    try:
+        return [row_cls(*row) for row in _fetch(conn, statement, params)]
+    finally:
+        if own_conn:
+            conn.close()
+
+
+@timed
+def get_disease_info(disease_name):
+    conn = connect_db()
+    result = None
+    try:
+        for mode in _match_modes():
+            rows = _query(*_disease_info_query(disease_name, mode), DiseaseInfo, conn)
+            if rows:
+                result = rows[0]
+                break
+    finally:
+        conn.close()
+
+    if result:
+        result.symptoms = _dedup_symptoms(_text(result.symptoms))
+        result.prevention = _text(result.prevention)
+    return result
+
+
+@timed
+def get_disease_by_symptom(symptom):
+    conn = connect_db()
+    results = []
+    try:
+        for mode in _match_modes():
+            results = _query(*_symptom_query(symptom, mode), DiseaseName, conn)
+            if results:
+                break
+    finally:
+        conn.close()
+    return results
+
+
+@timed
+def get_today_alert(disease_name, today):
+    """
+    Alerts (disease, cases, date) for diseases matching `disease_name` or one of its aliases
+    (prefix match, then LIKE) on the given date; always a list (possibly empty).
+    """
+    conn = connect_db()
+    results = []
+    try:
+        for mode in _match_modes():
+            results = _query(*_today_alert_query(disease_name, today, mode), CaseAlert, conn)
+            if results:
+                break
+    finally:
+        conn.close()
+    return results
+
+
+@timed
+def get_diseases_by_multiple_symptoms(symptoms, limit=None):
+    normalized = list(dict.fromkeys(normalize_word(s) for s in symptoms if s.strip()))
+    if not normalized:
+        return []
+    normalized = _pad(normalized, _bucket(len(normalized)))
+
+    conn = connect_db()
+    results = []
+    try:
+        for mode in _match_modes():
+            results = _query(*_multi_symptom_query(normalized, mode, limit), DiseaseMatch, conn)
+            if results:
+                break
+    finally:
+        conn.close()
+
+    for row in results:
+        row.symptoms = _dedup_symptoms(_text(row.symptoms))
+        row.prevention = _text(row.prevention)
+    return results
+
+
+@timed
+def get_all_diseases():
+    return _query(ALL_DISEASES_QUERY, (), DiseaseName)
+
+
+@timed
+def get_data_version():
+    rows = _fetch_rows(DATA_VERSION_QUERY)
+    return rows[0][0] if rows else 0
+
+
+def resolve_ids(conn, table, id_col, name_col, names, batch_size):
+    """name -> id for every name, one prepared IN (...) query per batch (arity bucketed)."""
+    ids = {}
+    names = list(names)
+    for i in range(0, len(names), batch_size):
+        chunk = names[i:i + batch_size]
+        chunk = _pad(chunk, _bucket(len(chunk)))
+        placeholders = ", ".join(["%s"] * len(chunk))
+        statement = f"SELECT {id_col}, {name_col} FROM {table} WHERE {name_col} IN ({placeholders})"
+        for row_id, name in _fetch(conn, statement, chunk):
+            ids[_text(name)] = row_id
+    return ids
+
+
+def disease_name_ids(conn=None):
+    """normalized disease name or alias -> disease_id"""
+    own_conn = conn is None
+    conn = conn or connect_db()
+    try:
+        lookup = {normalize_word(_text(name)): disease_id
+                  for name, disease_id in _fetch(conn, "SELECT disease_name, disease_id FROM diseases")}
+        for alias, disease_id in _fetch(conn, "SELECT alias_name, disease_id FROM disease_aliases"):
+            lookup.setdefault(normalize_word(_text(alias)), disease_id)
+    finally:
+        if own_conn:
+            conn.close()
+    return lookup
+
+
+def knowledge_rows():
+    """(diseases, symptoms, links, preventions, aliases, variants) for knowledge.KnowledgeIndex."""
+    conn = connect_db()
+    try:
+        return (
+            _fetch(conn, "SELECT disease_id, disease_name FROM diseases ORDER BY disease_id"),
+            _fetch(conn, "SELECT symptom_id, symptom_name FROM symptoms"),
+            _fetch(conn, "SELECT disease_id, symptom_id FROM disease_symptoms"),
+            _fetch(conn, "SELECT disease_id, prevention_text FROM preventions ORDER BY prevention_id"),
+            _fetch(conn, "SELECT alias_name, disease_id FROM disease_aliases"),
+            _fetch(conn, "SELECT variant_name, symptom_id FROM symptom_variants"),
+        )
+    finally:
+        conn.close()
+
+
+def daily_case_totals(day, previous_day):
+    """[(disease_name, date, total_cases)] from case_daily_summary for two days."""
+    return _fetch_rows(
+        """
+        SELECT d.disease_name, s.summary_date, s.total_cases
+        FROM case_daily_summary s
+        JOIN diseases d ON s.disease_id = d.disease_id
+        WHERE s.summary_date IN (%s, %s)
+        """,
+        (day, previous_day)
+    )
+
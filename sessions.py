@@ -0,0 +1,174 @@
+# sessions.py
+import json
+import time
+import threading
+from cache import LRUCache
+from config import SESSION_BACKEND, SESSION_TTL, SESSION_MAX, REDIS_URL
+
+
+class SessionStore:
+    """
+    Per-sender conversation state (currently just the chosen language).
+    Implementations provide _load/_save/delete; get() keeps the hit/miss counters.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sender):
+        session = self._load(sender)
+        if session is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return session
+
+    def set(self, sender, session):
+        self._save(sender, session)
+
+    def touch(self, sender, session):
+        """Restart the sender's TTL (called on every message, so only idle sessions expire)."""
+        self._save(sender, session)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class MemorySessionStore(SessionStore):
+    """Bounded LRU with TTL; entries past their TTL are dropped when next read."""
+
+    def __init__(self, maxsize=SESSION_MAX, ttl=SESSION_TTL):
+        super().__init__()
+        self._cache = LRUCache(maxsize, ttl)
+
+    def _load(self, sender):
+        return self._cache.get(sender)
+
+    def _save(self, sender, session):
+        self._cache.set(sender, dict(session))
+
+    def delete(self, sender):
+        self._cache.pop(sender)
+
+    def stats(self):
+        s = super().stats()
+        s.update(size=len(self._cache), evictions=self._cache.evictions, expirations=self._cache.expirations)
+        return s
+
+
+class MySQLSessionStore(SessionStore):
+    """Shared across workers/hosts through the user_sessions table (created by migrations.py)."""
+
+    def __init__(self, ttl=SESSION_TTL):
+        super().__init__()
+        self.ttl = ttl
+
+    def _load(self, sender):
+        from db import connect_db
+        conn = connect_db()
+        cursor = conn.cursor()
+        cursor.execute("SELECT data, expires_at FROM user_sessions WHERE sender = %s", (sender,))
+        row = cursor.fetchone()
+        session = None
+        if row and row[1] > time.time():
+            session = json.loads(row[0])
+        elif row:
+            cursor.execute("DELETE FROM user_sessions WHERE sender = %s", (sender,))
+            conn.commit()
+        cursor.close()
+        conn.close()
+        return session
+
+    def _save(self, sender, session):
+        from db import connect_db
+        conn = connect_db()
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO user_sessions (sender, data, expires_at) VALUES (%s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE data = VALUES(data), expires_at = VALUES(expires_at)",
+            (sender, json.dumps(session), time.time() + self.ttl)
+        )
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+    def touch(self, sender, session):
+        from db import connect_db
+        conn = connect_db()
+        cursor = conn.cursor()
+        cursor.execute("UPDATE user_sessions SET expires_at = %s WHERE sender = %s", (time.time() + self.ttl, sender))
+        if cursor.rowcount == 0:
+            # expired and deleted since it was read
+            self._save(sender, session)
+        else:
+            conn.commit()
+        cursor.close()
+        conn.close()
+
+    def delete(self, sender):
+        from db import connect_db
+        conn = connect_db()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM user_sessions WHERE sender = %s", (sender,))
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+
+class RedisSessionStore(SessionStore):
+    """Any client with Redis' get/set(ex=)/delete works, e.g. redis.Redis or LocalRedis."""
+
+    def __init__(self, client, ttl=SESSION_TTL, prefix="session:"):
+        super().__init__()
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _load(self, sender):
+        raw = self.client.get(self.prefix + sender)
+        return json.loads(raw) if raw else None
+
+    def _save(self, sender, session):
+        self.client.set(self.prefix + sender, json.dumps(session), ex=self.ttl)
+
+    def delete(self, sender):
+        self.client.delete(self.prefix + sender)
+
+
+class LocalRedis:
+    """In-process stand-in for a Redis server (get/set with ex/delete only)."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires <= time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (value, time.time() + ex if ex else None)
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            return 1 if self._data.pop(key, None) is not None else 0
+
+
+def get_store():
+    """Build the store selected by SESSION_BACKEND (memory, mysql or redis)."""
+    if SESSION_BACKEND == "mysql":
+        return MySQLSessionStore()
+    if SESSION_BACKEND == "redis":
+        import redis
+        return RedisSessionStore(redis.Redis.from_url(REDIS_URL))
+    return MemorySessionStore()
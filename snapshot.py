@@ -0,0 +1,266 @@
+# snapshot.py
+# Binary export of the knowledge tables, so a worker can build its knowledge index without
+# MySQL: starting or refreshing a worker reads this file instead of running the knowledge
+# queries. It is a row source only; each worker still builds and holds its own
+# knowledge.KnowledgeIndex, and every lookup goes through that. A new export replaces the
+# file atomically; workers notice the new inode on their next check and rebuild.
+#
+# Layout (little-endian): header, section table, then 8-byte aligned sections of uint32
+# arrays. Strings are interned into one UTF-8 blob and referred to by number everywhere.
+import os
+import sys
+import mmap
+import time
+import array
+import struct
+import threading
+from db import normalize_word
+from config import KNOWLEDGE_SNAPSHOT, KNOWLEDGE_VERSION_CHECK
+
+MAGIC = b"KBSNAP\x00\x01"
+FORMAT_VERSION = 3
+HEADER = struct.Struct("<8sIIQ")  # magic, format version, section count, data_version
+SECTION = struct.Struct("<QQ")  # offset, length in bytes
+
+# string_offsets[n]:string_offsets[n + 1] is string n in string_blob
+SECTIONS = (
+    "string_offsets", "string_blob",
+    "disease_ids", "disease_names",  # per disease position
+    "prevention_offsets", "preventions",  # CSR: disease -> prevention strings
+    "symptom_names",  # per symptom position (normalized)
+    "posting_offsets", "postings",  # CSR: symptom -> disease positions
+    "disease_keys",  # (string, disease) pairs sorted by string: names and aliases
+    "symptom_keys",  # (string, symptom) pairs sorted by string: names and variants
+)
+
+
+class _Strings:
+    """Interning table used while exporting."""
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def intern(self, value):
+        sid = self.ids.get(value)
+        if sid is None:
+            sid = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return sid
+
+
+def _u32(values):
+    data = array.array("I", values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+
+def _csr(lists):
+    offsets = [0]
+    items = []
+    for values in lists:
+        items.extend(values)
+        offsets.append(len(items))
+    return offsets, items
+
+
+def _sorted_keys(pairs, strings):
+    # deterministic order, so the same tables always export to the same bytes
+    pairs = sorted(set(pairs), key=lambda pair: (strings.values[pair[0]].encode("utf-8"), pair[1]))
+    return [value for pair in pairs for value in pair]
+
+
+def build(diseases, symptoms, links, preventions, aliases=(), variants=(), version=0):
+    """Snapshot bytes for the same rows knowledge.KnowledgeIndex takes."""
+    strings = _Strings()
+    disease_pos = {}
+    disease_ids, disease_names = [], []
+    for disease_id, name in diseases:
+        if disease_id in disease_pos:
+            continue
+        disease_pos[disease_id] = len(disease_ids)
+        disease_ids.append(disease_id)
+        disease_names.append(strings.intern(name))
+
+    symptom_pos = {}
+    symptom_names = []
+    for symptom_id, name in symptoms:
+        if symptom_id not in symptom_pos:
+            symptom_pos[symptom_id] = len(symptom_names)
+            symptom_names.append(strings.intern(normalize_word(name)))
+
+    postings = [[] for _ in symptom_names]
+    for disease_id, symptom_id in links:
+        d, s = disease_pos.get(disease_id), symptom_pos.get(symptom_id)
+        if d is None or s is None or d in postings[s]:
+            continue
+        postings[s].append(d)
+
+    prevention_lists = [[] for _ in disease_ids]
+    for disease_id, text in preventions:
+        d = disease_pos.get(disease_id)
+        if d is not None:
+            sid = strings.intern(text)
+            if sid not in prevention_lists[d]:
+                prevention_lists[d].append(sid)
+
+    disease_keys = [(strings.intern(normalize_word(strings.values[sid])), d) for d, sid in enumerate(disease_names)]
+    disease_keys += [(strings.intern(normalize_word(alias)), disease_pos[disease_id])
+                     for alias, disease_id in aliases if disease_id in disease_pos]
+    symptom_keys = [(sid, s) for s, sid in enumerate(symptom_names)]
+    symptom_keys += [(strings.intern(normalize_word(variant)), symptom_pos[symptom_id])
+                     for variant, symptom_id in variants if symptom_id in symptom_pos]
+
+    blob = bytearray()
+    string_offsets = [0]
+    for value in strings.values:
+        blob += value.encode("utf-8")
+        string_offsets.append(len(blob))
+
+    pv_offsets, pv_items = _csr(prevention_lists)
+    sp_offsets, sp_items = _csr(postings)
+    sections = [
+        _u32(string_offsets), bytes(blob),
+        _u32(disease_ids), _u32(disease_names),
+        _u32(pv_offsets), _u32(pv_items),
+        _u32(symptom_names),
+        _u32(sp_offsets), _u32(sp_items),
+        _u32(_sorted_keys(disease_keys, strings)),
+        _u32(_sorted_keys(symptom_keys, strings)),
+    ]
+
+    out = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, len(sections), version or 0))
+    table_at = len(out)
+    out += bytes(SECTION.size * len(sections))
+    for i, data in enumerate(sections):
+        out += bytes(-len(out) % 8)
+        SECTION.pack_into(out, table_at + i * SECTION.size, len(out), len(data))
+        out += data
+    return bytes(out)
+
+
+def write(path, data):
+    """Write next to `path` and rename over it, so readers only ever see a complete file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def export(path=None):
+    """Export the current MySQL tables to `path` (KNOWLEDGE_SNAPSHOT by default); no-op when unset."""
+    path = path or KNOWLEDGE_SNAPSHOT
+    if not path:
+        return None
+    from repository import knowledge_rows, get_data_version
+    version = get_data_version()
+    data = build(*knowledge_rows(), version=version)
+    write(path, data)
+    print(f"Knowledge snapshot v{version} written to {path} ({len(data)} bytes)")
+    return path
+
+
+class Snapshot:
+    """A mapped snapshot file; knowledge_rows() decodes it back into the rows KnowledgeIndex takes."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            stat = os.fstat(f.fileno())
+        self.key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        buf = memoryview(self._map)
+        magic, fmt, count, self.version = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION or count != len(SECTIONS):
+            raise ValueError(f"{path}: not a version {FORMAT_VERSION} knowledge snapshot")
+        if sys.byteorder != "little":
+            raise ValueError("knowledge snapshots are little-endian; this platform is not")
+
+        for i, name in enumerate(SECTIONS):
+            offset, length = SECTION.unpack_from(buf, HEADER.size + i * SECTION.size)
+            view = buf[offset:offset + length]
+            setattr(self, "_" + name, view if name == "string_blob" else view.cast("I"))
+        self.disease_count = len(self._disease_ids)
+        self.symptom_count = len(self._symptom_names)
+
+    def string(self, sid):
+        return str(self._string_blob[self._string_offsets[sid]:self._string_offsets[sid + 1]], "utf-8")
+
+    def _slice(self, offsets, items, pos):
+        return items[offsets[pos]:offsets[pos + 1]]
+
+    def disease_name(self, d):
+        return self.string(self._disease_names[d])
+
+    def knowledge_rows(self):
+        """Rows for knowledge.KnowledgeIndex, so the index can be built without MySQL."""
+        diseases = [(self._disease_ids[d], self.disease_name(d)) for d in range(self.disease_count)]
+        symptoms = [(s, self.string(self._symptom_names[s])) for s in range(self.symptom_count)]
+        links = [(self._disease_ids[d], s) for s in range(self.symptom_count)
+                 for d in self._slice(self._posting_offsets, self._postings, s)]
+        preventions = [(self._disease_ids[d], self.string(sid)) for d in range(self.disease_count)
+                       for sid in self._slice(self._prevention_offsets, self._preventions, d)]
+        keys = self._disease_keys
+        names = {d: normalize_word(name) for d, (_, name) in enumerate(diseases)}
+        aliases = [(self.string(keys[i]), self._disease_ids[keys[i + 1]]) for i in range(0, len(keys), 2)
+                   if self.string(keys[i]) != names[keys[i + 1]]]
+        keys = self._symptom_keys
+        variants = [(self.string(keys[i]), keys[i + 1]) for i in range(0, len(keys), 2)
+                    if keys[i] != self._symptom_names[keys[i + 1]]]
+        return diseases, symptoms, links, preventions, aliases, variants
+
+
+_current = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def current():
+    """
+    The mapped KNOWLEDGE_SNAPSHOT, or None when it is unset or missing. The file is re-stat'ed
+    every KNOWLEDGE_VERSION_CHECK seconds and re-mapped when an export replaced it.
+    """
+    global _current, _checked_at
+    if not KNOWLEDGE_SNAPSHOT:
+        return None
+    due = time.monotonic() - _checked_at >= KNOWLEDGE_VERSION_CHECK if KNOWLEDGE_VERSION_CHECK else False
+    if _current is not None and not due:
+        return _current
+    with _lock:
+        _checked_at = time.monotonic()
+        try:
+            stat = os.stat(KNOWLEDGE_SNAPSHOT)
+        except FileNotFoundError:
+            return _current
+        if _current is None or _current.key != (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+            try:
+                _current = Snapshot(KNOWLEDGE_SNAPSHOT)
+            except (OSError, ValueError) as e:
+                print("Could not open knowledge snapshot:", e)
+    return _current
+
+
+def stats():
+    snap = _current
+    if snap is None:
+        return {}
+    return {"data_version": snap.version, "bytes": len(snap._map), "diseases": snap.disease_count,
+            "symptoms": snap.symptom_count}
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "export"
+    target = sys.argv[2] if len(sys.argv) > 2 else KNOWLEDGE_SNAPSHOT
+    if not target:
+        sys.exit("usage: python snapshot.py export|info PATH (or set KNOWLEDGE_SNAPSHOT)")
+    if command == "info":
+        snap = Snapshot(target)
+        print(f"{target}: data_version {snap.version}, {snap.disease_count} diseases, "
+              f"{snap.symptom_count} symptoms, {len(snap._map)} bytes")
+    else:
+        export(target)
@@ -0,0 +1,193 @@
+# sync.py
+import sys
+from db import connect_db, _symptom_tokens, bump_data_version
+from migrations import migrate
+from loader import read_dataset, normalize_dataset, _chunks, DEFAULT_DATASET, BATCH_SIZE
+from repository import resolve_ids
+
+
+def _desired_state(dataset):
+    """Normalized names, links, preventions, aliases and variants the tables should hold."""
+    diseases, aliases, links, variants = normalize_dataset(dataset)
+    preventions = {(d, p.strip()) for d, details in diseases.items() for p in details.get("preventions", [])}
+    return {
+        "diseases": set(diseases),
+        "symptoms": {s for _, s in links},
+        "links": links,
+        "preventions": preventions,
+        "aliases": set(aliases.items()),
+        "variants": variants,
+    }
+
+
+def _current_state(cursor):
+    cursor.execute("SELECT disease_name FROM diseases")
+    diseases = {r[0] for r in cursor.fetchall()}
+    cursor.execute("SELECT symptom_name FROM symptoms")
+    symptoms = {r[0] for r in cursor.fetchall()}
+    cursor.execute("""
+        SELECT d.disease_name, s.symptom_name
+        FROM disease_symptoms ds
+        JOIN diseases d ON ds.disease_id = d.disease_id
+        JOIN symptoms s ON ds.symptom_id = s.symptom_id
+    """)
+    links = set(cursor.fetchall())
+    cursor.execute("""
+        SELECT d.disease_name, p.prevention_text
+        FROM preventions p
+        JOIN diseases d ON p.disease_id = d.disease_id
+    """)
+    preventions = set(cursor.fetchall())
+    cursor.execute("""
+        SELECT a.alias_name, d.disease_name
+        FROM disease_aliases a
+        JOIN diseases d ON a.disease_id = d.disease_id
+    """)
+    aliases = set(cursor.fetchall())
+    cursor.execute("""
+        SELECT v.variant_name, s.symptom_name
+        FROM symptom_variants v
+        JOIN symptoms s ON v.symptom_id = s.symptom_id
+    """)
+    variants = set(cursor.fetchall())
+    return {
+        "diseases": diseases,
+        "symptoms": symptoms,
+        "links": links,
+        "preventions": preventions,
+        "aliases": aliases,
+        "variants": variants,
+    }
+
+
+def sync_dataset(dataset, conn=None, batch_size=BATCH_SIZE):
+    """
+    Bring the knowledge tables in line with `dataset` without dropping anything wholesale:
+    - diseases/symptoms/aliases are upserted (ON DUPLICATE KEY UPDATE); links, preventions
+      and symptom variants are diffed
+    - the cases table is never touched; a removed disease that still has cases keeps its row
+    - data_version is bumped when anything changed
+    Returns a dict of per-table change counts.
+    """
+    own_conn = conn is None
+    conn = conn or connect_db()
+    migrate(conn)
+    cursor = conn.cursor()
+
+    want = _desired_state(dataset)
+    have = _current_state(cursor)
+
+    changes = {
+        "diseases_added": sorted(want["diseases"] - have["diseases"]),
+        "symptoms_added": sorted(want["symptoms"] - have["symptoms"]),
+        "links_added": sorted(want["links"] - have["links"]),
+        "links_removed": sorted(have["links"] - want["links"]),
+        "preventions_added": sorted(want["preventions"] - have["preventions"]),
+        "preventions_removed": sorted(have["preventions"] - want["preventions"]),
+        "aliases_added": sorted(want["aliases"] - have["aliases"]),
+        "aliases_removed": sorted(have["aliases"] - want["aliases"]),
+        "variants_added": sorted(want["variants"] - have["variants"]),
+        "variants_removed": sorted(have["variants"] - want["variants"]),
+    }
+
+    for chunk in _chunks(changes["diseases_added"], batch_size):
+        cursor.executemany(
+            "INSERT INTO diseases (disease_name) VALUES (%s) "
+            "ON DUPLICATE KEY UPDATE disease_name = VALUES(disease_name)",
+            [(d,) for d in chunk]
+        )
+    for chunk in _chunks(changes["symptoms_added"], batch_size):
+        cursor.executemany(
+            "INSERT INTO symptoms (symptom_name) VALUES (%s) "
+            "ON DUPLICATE KEY UPDATE symptom_name = VALUES(symptom_name)",
+            [(s,) for s in chunk]
+        )
+
+    disease_ids = resolve_ids(conn, "diseases", "disease_id", "disease_name",
+                               sorted(want["diseases"] | have["diseases"]), batch_size)
+    symptom_ids = resolve_ids(conn, "symptoms", "symptom_id", "symptom_name",
+                               sorted(want["symptoms"] | have["symptoms"]), batch_size)
+
+    token_rows = [(t, symptom_ids[s]) for s in changes["symptoms_added"] for t in _symptom_tokens(s)]
+    for chunk in _chunks(token_rows, batch_size):
+        cursor.executemany("INSERT IGNORE INTO symptom_tokens (token, symptom_id) VALUES (%s, %s)", chunk)
+
+    for chunk in _chunks(changes["links_removed"], batch_size):
+        cursor.executemany(
+            "DELETE FROM disease_symptoms WHERE disease_id = %s AND symptom_id = %s",
+            [(disease_ids[d], symptom_ids[s]) for d, s in chunk]
+        )
+    for chunk in _chunks(changes["links_added"], batch_size):
+        cursor.executemany(
+            "INSERT INTO disease_symptoms (disease_id, symptom_id) VALUES (%s, %s)",
+            [(disease_ids[d], symptom_ids[s]) for d, s in chunk]
+        )
+    for chunk in _chunks(changes["preventions_removed"], batch_size):
+        cursor.executemany(
+            "DELETE FROM preventions WHERE disease_id = %s AND prevention_text = %s",
+            [(disease_ids[d], p) for d, p in chunk]
+        )
+    for chunk in _chunks(changes["preventions_added"], batch_size):
+        cursor.executemany(
+            "INSERT INTO preventions (disease_id, prevention_text) VALUES (%s, %s)",
+            [(disease_ids[d], p) for d, p in chunk]
+        )
+    for chunk in _chunks(changes["aliases_removed"], batch_size):
+        cursor.executemany("DELETE FROM disease_aliases WHERE alias_name = %s", [(a,) for a, _ in chunk])
+    for chunk in _chunks(changes["aliases_added"], batch_size):
+        cursor.executemany(
+            "INSERT INTO disease_aliases (alias_name, disease_id) VALUES (%s, %s) "
+            "ON DUPLICATE KEY UPDATE disease_id = VALUES(disease_id)",
+            [(a, disease_ids[d]) for a, d in chunk]
+        )
+    for chunk in _chunks(changes["variants_removed"], batch_size):
+        cursor.executemany(
+            "DELETE FROM symptom_variants WHERE variant_name = %s AND symptom_id = %s",
+            [(v, symptom_ids[s]) for v, s in chunk]
+        )
+    for chunk in _chunks(changes["variants_added"], batch_size):
+        cursor.executemany(
+            "INSERT IGNORE INTO symptom_variants (variant_name, symptom_id) VALUES (%s, %s)",
+            [(v, symptom_ids[s]) for v, s in chunk]
+        )
+
+    # Drop diseases/symptoms that left the dataset, keeping any disease with case history.
+    # Alias names that are still full disease rows (older seeds copied everything into them)
+    # go regardless: their cases are duplicates of the canonical disease's.
+    alias_names = {a for a, _ in want["aliases"]}
+    removed_diseases = sorted(have["diseases"] - want["diseases"])
+    removed_symptoms = sorted(have["symptoms"] - want["symptoms"])
+    changes["diseases_removed"] = []
+    for chunk in _chunks(removed_diseases, batch_size):
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(
+            f"SELECT DISTINCT d.disease_name FROM diseases d JOIN cases c ON c.disease_id = d.disease_id "
+            f"WHERE d.disease_name IN ({placeholders})",
+            chunk
+        )
+        keep = {r[0] for r in cursor.fetchall()} - alias_names
+        doomed = [d for d in chunk if d not in keep]
+        if doomed:
+            cursor.executemany("DELETE FROM diseases WHERE disease_id = %s", [(disease_ids[d],) for d in doomed])
+            changes["diseases_removed"].extend(doomed)
+    for chunk in _chunks(removed_symptoms, batch_size):
+        cursor.executemany("DELETE FROM symptoms WHERE symptom_id = %s", [(symptom_ids[s],) for s in chunk])
+    changes["symptoms_removed"] = removed_symptoms
+
+    summary = {key: len(value) for key, value in changes.items()}
+    if any(summary.values()):
+        bump_data_version(cursor)
+    conn.commit()
+
+    cursor.close()
+    if own_conn:
+        conn.close()
+    if any(summary.values()):
+        import snapshot
+        snapshot.export()
+    print("Sync complete:", summary)
+    return summary
+
+
+if __name__ == "__main__":
+    sync_dataset(read_dataset(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DATASET))
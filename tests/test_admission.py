@@ -0,0 +1,42 @@
+# tests/test_admission.py
+import threading
+import admission
+
+
+def setup_function():
+    admission.clear()
+
+
+def test_first_delivery_processes_and_replay_gets_stored_reply():
+    assert admission.claim("SM1", wait=0) is None
+    assert admission.claim("SM1", wait=0) is admission.IN_PROGRESS
+    admission.complete("SM1", "<Response/>")
+    assert admission.claim("SM1", wait=0) == "<Response/>"
+
+
+def test_released_claim_is_taken_over_by_waiting_retry():
+    assert admission.claim("SM2", wait=0) is None
+    threading.Timer(0.05, admission.release, args=("SM2",)).start()
+    assert admission.claim("SM2", wait=1) is None
+    admission.release("SM2")
+
+
+def test_response_stored_between_checks_is_replayed(monkeypatch):
+    # complete() of the first delivery lands after claim()'s unlocked look but before it
+    # takes the lock: the retry must replay it instead of processing the message again
+    responses = admission._responses
+
+    class Late:
+        def __init__(self):
+            self.looks = 0
+
+        def get(self, sid):
+            self.looks += 1
+            if self.looks == 1:
+                responses.set(sid, "<Response>done</Response>")
+                return None
+            return responses.get(sid)
+
+    monkeypatch.setattr(admission, "_responses", Late())
+    assert admission.claim("SM3", wait=0) == "<Response>done</Response>"
+    assert "SM3" not in admission._pending
@@ -0,0 +1,148 @@
+# tests/test_broadcast.py
+import pytest
+import broadcast
+from broadcast import FakeTwilioClient, twilio_sender
+
+
+class FakeCursor:
+    """Just enough of a DB-API cursor for broadcast(): subscriber pages and progress rows."""
+
+    def __init__(self, db):
+        self.db = db
+        self.result = []
+
+    def execute(self, query, params=()):
+        if query.startswith("SELECT last_subscriber_id"):
+            row = self.db.progress.get(params[0])
+            self.result = [row] if row else []
+        elif query.startswith("INSERT INTO broadcast_progress"):
+            self.db.pending[params[0]] = tuple(params[1:])
+        elif query.startswith("SELECT subscriber_id"):
+            last_id, limit = params
+            self.result = [row for row in self.db.subscribers if row[0] > last_id][:limit]
+        else:
+            raise AssertionError(query)
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return list(self.result)
+
+    def close(self):
+        pass
+
+
+class FakeDB:
+    def __init__(self, subscribers):
+        self.subscribers = subscribers
+        self.progress = {}
+        self.pending = {}
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.progress.update(self.pending)
+        self.pending = {}
+
+    def close(self):
+        self.pending = {}
+
+
+class Crash(BaseException):
+    """Simulates the process dying mid-broadcast (not caught by the retry loop)."""
+
+
+@pytest.fixture
+def db(monkeypatch):
+    subscribers = [(i, f"whatsapp:+91{i}", lang) for i, lang in enumerate(["en", "hi", None, "or", "hi"], 1)]
+    fake = FakeDB(subscribers)
+    monkeypatch.setattr(broadcast, "connect_db", lambda: fake)
+    monkeypatch.setattr(broadcast, "RETRY_BASE_DELAY", 0)
+    return fake
+
+
+BODIES = {"en": "alert", "hi": "[hi] alert", "or": "[or] alert", None: "alert + prompt"}
+
+
+def test_each_subscriber_gets_their_language(db):
+    client = FakeTwilioClient()
+    sent, failed = broadcast.broadcast("b1", BODIES, twilio_sender(client, "whatsapp:+1"), rate=1000, page_size=2)
+    assert (sent, failed) == (5, 0)
+    assert [(m["to"], m["body"]) for m in sorted(client.sent, key=lambda m: m["to"])] == [
+        ("whatsapp:+911", "alert"), ("whatsapp:+912", "[hi] alert"), ("whatsapp:+913", "alert + prompt"),
+        ("whatsapp:+914", "[or] alert"), ("whatsapp:+915", "[hi] alert"),
+    ]
+    assert db.progress["b1"] == (5, 5, 0)
+
+
+def test_rate_limited_sends_are_retried(db):
+    client = FakeTwilioClient(fail_first=3, fail_status=429)
+    sent, failed = broadcast.broadcast("b2", BODIES, twilio_sender(client, "x"), rate=1000, workers=1)
+    assert (sent, failed) == (5, 0)
+    assert len(client.sent) == 5
+
+
+def test_retries_take_a_token_per_attempt(db, monkeypatch):
+    acquired = []
+
+    class CountingBucket:
+        def __init__(self, rate):
+            pass
+
+        def acquire(self):
+            acquired.append(1)
+
+    monkeypatch.setattr(broadcast, "TokenBucket", CountingBucket)
+    client = FakeTwilioClient(fail_first=3, fail_status=429)
+    broadcast.broadcast("b5", BODIES, twilio_sender(client, "x"), rate=1000, workers=1)
+    assert len(acquired) == 5 + 3
+
+
+def test_client_errors_are_not_retried(db):
+    client = FakeTwilioClient(fail_first=1, fail_status=400)
+    sent, failed = broadcast.broadcast("b3", BODIES, twilio_sender(client, "x"), rate=1000, workers=1)
+    assert (sent, failed) == (4, 1)
+
+
+def test_rerun_resumes_after_the_last_finished_page(db):
+    client = FakeTwilioClient()
+    deliver = twilio_sender(client, "x")
+    calls = []
+
+    def crash_on_third(to, body):
+        calls.append(to)
+        if len(calls) == 3:
+            raise Crash()
+        deliver(to, body)
+
+    with pytest.raises(Crash):
+        broadcast.broadcast("b4", BODIES, crash_on_third, rate=1000, workers=1, page_size=2)
+    assert db.progress["b4"] == (2, 2, 0)
+
+    sent, failed = broadcast.broadcast("b4", BODIES, deliver, rate=1000, workers=1, page_size=2)
+    assert (sent, failed) == (5, 0)
+    # the finished page is not sent again; the interrupted one is redone as a whole
+    received = [m["to"] for m in client.sent]
+    assert received.count("whatsapp:+911") == received.count("whatsapp:+912") == 1
+    assert set(received) == {f"whatsapp:+91{i}" for i in range(1, 6)}
+
+
+def test_render_alert_localizes_with_the_stub_translator(monkeypatch):
+    import catalog
+    import knowledge
+    import translation
+    index = knowledge.KnowledgeIndex([(1, "cholera")], [(1, "diarrhea")], [(1, 1)], [])
+    monkeypatch.setattr(knowledge, "_index", index)
+    monkeypatch.setattr(knowledge, "KNOWLEDGE_VERSION_CHECK", 0)
+    stub = translation.StubBackend()
+    monkeypatch.setattr(translation, "_backend", stub)
+    catalog.clear()
+
+    bodies = broadcast.render_alert("cholera", 12)
+    assert bodies["en"] == "Disease Alert: Today cholera has 12 reported cases."
+    assert bodies["hi"].startswith("[hi] Disease Alert") and "[hi] cholera" in bodies["hi"]
+    assert bodies[None] == bodies["en"] + broadcast.LANGUAGE_PROMPT
+    assert stub.calls > 0
+    catalog.clear()
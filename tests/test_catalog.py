@@ -0,0 +1,48 @@
+# tests/test_catalog.py
+import pytest
+import catalog
+import knowledge
+import translation
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    index = knowledge.KnowledgeIndex([(1, "cholera")], [(1, "diarrhea")], [(1, 1)], [(1, "boil water")])
+    monkeypatch.setattr(knowledge, "_index", index)
+    monkeypatch.setattr(knowledge, "KNOWLEDGE_VERSION_CHECK", 0)
+    backend = translation.StubBackend()
+    monkeypatch.setattr(translation, "_backend", backend)
+    catalog.clear()
+    yield backend
+    catalog.clear()
+
+
+def test_refresh_translates_only_new_terms_and_keeps_serving(stub):
+    assert catalog.term("cholera", "hi") == "[hi] cholera"
+    before = stub.calls
+    version = catalog.version()
+
+    index = knowledge.KnowledgeIndex([(1, "cholera"), (2, "typhoid")], [(1, "diarrhea")], [(1, 1), (2, 1)],
+                                     [(1, "boil water")])
+    threads = catalog._refresh(index)
+    # the old terms serve while the refresh runs
+    assert catalog.term("cholera", "hi") == "[hi] cholera"
+    for thread in threads:
+        thread.join()
+
+    assert catalog.term("typhoid", "hi") == "[hi] typhoid"
+    assert catalog.term("cholera", "hi") == "[hi] cholera"
+    assert stub.calls - before == 1
+    assert catalog.version() > version
+
+
+def test_superseded_refresh_does_not_overwrite_a_newer_one(stub):
+    catalog.term("cholera", "hi")
+    old = knowledge.KnowledgeIndex([(1, "cholera"), (2, "typhoid")], [], [], [])
+    new = knowledge.KnowledgeIndex([(1, "cholera"), (3, "dengue")], [], [], [])
+    with catalog._language_lock("hi"):
+        threads = catalog._refresh(old) + catalog._refresh(new)
+    for thread in threads:
+        thread.join()
+    assert "dengue" in catalog.localized_terms("hi")
+    assert "typhoid" not in catalog.localized_terms("hi")
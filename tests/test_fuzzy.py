@@ -0,0 +1,19 @@
+# tests/test_fuzzy.py
+import time
+from fuzzy import FuzzyIndex, MAX_PHRASE_WORDS
+
+
+def test_corrects_typos_within_the_edit_limit():
+    index = FuzzyIndex(["joint pain", "diarrhea", "fever"])
+    assert index.correct("jont pain") == "joint pain"
+    assert index.correct_word("diarhea") == "diarrhea"
+    assert index.correct_word("xyzzy") == "xyzzy"
+
+
+def test_long_input_is_not_expanded():
+    index = FuzzyIndex(["joint pain", "diarrhea", "fever"])
+    word = "a" * 1600
+    started = time.perf_counter()
+    assert index.correct_word(word) == word
+    assert index.correct(" ".join(["feverr"] * 200)).split()[:MAX_PHRASE_WORDS] == ["fever"] * MAX_PHRASE_WORDS
+    assert time.perf_counter() - started < 1.0
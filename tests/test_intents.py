@@ -0,0 +1,44 @@
+# tests/test_intents.py
+import pytest
+import intents
+from knowledge import KnowledgeIndex
+
+
+@pytest.fixture(autouse=True)
+def index(monkeypatch):
+    index = KnowledgeIndex([(1, "Malaria")], [(1, "fever")], [(1, 1)], [])
+    monkeypatch.setattr(intents, "get_index", lambda: index)
+    return index
+
+
+@pytest.mark.parametrize("message, kind, language", [
+    ("change language", "change_language", None),
+    ("language", "change_language", None),
+    ("भाषा", "change_language", None),
+    ("language: odia", "change_language", "or"),
+    ("what language is this", "unknown", None),
+    ("hindi", "language", "hi"),
+    ("ଓଡ଼ିଆ", "language", "or"),
+])
+def test_language_intents(message, kind, language):
+    intent = intents.classify(message)
+    assert (intent.kind, intent.language) == (kind, language)
+
+
+def test_every_language_choice_label_names_its_language():
+    from bot import LANGUAGE_CHOICES
+    for label, code in (("हिन्दी", "hi"), ("ଓଡ଼ିଆ", "or")):
+        assert label in LANGUAGE_CHOICES
+        assert intents.classify(label).language == code
+
+
+def test_known_names_match_regardless_of_stored_case():
+    intent = intents.classify("malaria")
+    assert (intent.kind, intent.query) == ("disease", "Malaria")
+
+
+def test_mid_session_question_about_language_keeps_the_session():
+    from bot import select_language
+    session = {"language": "hi"}
+    assert select_language(session, "what language is this") is None
+    assert session["language"] == "hi"
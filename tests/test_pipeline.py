@@ -0,0 +1,87 @@
+# tests/test_pipeline.py
+import time
+import random
+import threading
+from pipeline import Pipeline, InProcessQueue, LocalBrokerQueue
+
+
+def _recorder():
+    sent = []
+    lock = threading.Lock()
+
+    def send(sender, reply):
+        with lock:
+            sent.append((sender, reply))
+    return sent, send
+
+
+def test_local_broker_holds_jobs_until_drained():
+    sent, send = _recorder()
+    backend = LocalBrokerQueue()
+    pipeline = Pipeline(backend, lambda sender, body: body.upper(), send)
+
+    assert pipeline.submit("a", "one")
+    assert pipeline.submit("b", "two")
+    assert [job.body for job in backend.jobs] == ["one", "two"]
+    assert sent == []
+
+    assert backend.drain() == 2
+    assert sent == [("a", "ONE"), ("b", "TWO")]
+    assert pipeline.stats()["processed"] == 2
+
+
+def test_in_process_queue_keeps_each_senders_order():
+    sent, send = _recorder()
+    rng = random.Random(1)
+
+    def compute(sender, body):
+        time.sleep(rng.random() / 1000)
+        return body
+
+    pipeline = Pipeline(InProcessQueue(workers=4, maxsize=1000), compute, send)
+    senders = [f"whatsapp:+91{i}" for i in range(8)]
+    for n in range(25):
+        for sender in senders:
+            assert pipeline.submit(sender, f"{sender}#{n}")
+    pipeline.stop()
+
+    assert len(sent) == 25 * len(senders)
+    for sender in senders:
+        replies = [reply for to, reply in sent if to == sender]
+        assert replies == [f"{sender}#{n}" for n in range(25)]
+
+
+def test_full_shard_rejects_instead_of_blocking():
+    release = threading.Event()
+    sent, send = _recorder()
+
+    def compute(sender, body):
+        release.wait(5)
+        return body
+
+    pipeline = Pipeline(InProcessQueue(workers=1, maxsize=1), compute, send)
+    assert pipeline.submit("a", "1")
+    # the worker holds "1"; "2" fills the queue and "3" has no room
+    deadline = time.monotonic() + 5
+    while not pipeline.submit("a", "2"):
+        assert time.monotonic() < deadline
+    assert not pipeline.submit("a", "3")
+    release.set()
+    pipeline.stop()
+
+    assert pipeline.stats()["rejected"] >= 1
+    assert [reply for _, reply in sent] == ["1", "2"]
+
+
+def test_failed_job_is_counted_and_not_sent():
+    sent, send = _recorder()
+    backend = LocalBrokerQueue()
+
+    def compute(sender, body):
+        raise RuntimeError("boom")
+
+    pipeline = Pipeline(backend, compute, send)
+    pipeline.submit("a", "x")
+    backend.drain()
+    assert sent == []
+    assert pipeline.stats()["failed"] == 1
@@ -0,0 +1,22 @@
+# tests/test_ranking.py
+from knowledge import KnowledgeIndex
+
+
+def _index():
+    diseases = [(1, "covid"), (2, "influenza"), (3, "pneumonia"), (4, "tuberculosis"), (5, "asthma")]
+    symptoms = [(1, "cough"), (2, "fever"), (3, "cough with phlegm"), (4, "chronic cough"), (5, "coughing"),
+                (6, "body ache"), (7, "wheezing")]
+    links = [(1, 1), (1, 2), (2, 1), (2, 2), (2, 6), (3, 3), (3, 2), (4, 4), (4, 2), (5, 5), (5, 7)]
+    variants = [("cough", 4), ("cough", 5)]
+    return KnowledgeIndex(diseases, symptoms, links, [], variants=variants)
+
+
+def test_exact_symptom_outranks_variant_and_substring():
+    ranked = [row["disease"] for row in _index().ranked_diseases(["cough"], 5)]
+    assert ranked[:2] == ["covid", "influenza"]
+    assert ranked[-1] == "pneumonia"
+
+
+def test_exact_matches_lead_multi_symptom_queries():
+    ranked = [row["disease"] for row in _index().ranked_diseases(["cough", "fever"], 3)]
+    assert ranked[:2] == ["covid", "influenza"]
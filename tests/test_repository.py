@@ -0,0 +1,96 @@
+# tests/test_repository.py
+import pytest
+from mysql.connector import errors
+import db
+import repository
+
+
+class FakeCursor:
+    def __init__(self, cnx):
+        self.cnx = cnx
+
+    def execute(self, statement, params):
+        self.cnx.executed.append((self, statement))
+        if self.cnx.fail:
+            raise self.cnx.fail.pop(0)
+
+    def fetchall(self):
+        return [(1,)]
+
+
+class FakeConnection:
+    """The physical connection the pool keeps; a checkout wraps it (see FakeCheckout)."""
+
+    def __init__(self):
+        self.prepared = 0
+        self.rollbacks = 0
+        self.reconnects = 0
+        self.executed = []
+        self.fail = []
+
+    def cursor(self, prepared=False):
+        assert prepared
+        self.prepared += 1
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def reconnect(self, attempts=1, delay=0):
+        self.reconnects += 1
+
+
+class FakeCheckout:
+    def __init__(self, cnx):
+        self._cnx = cnx
+
+    def __getattr__(self, name):
+        return getattr(self._cnx, name)
+
+    def close(self):
+        pass
+
+
+def checkout(cnx):
+    with db._pool_lock:
+        db._pool_stats["in_use"] += 1
+    return db._PooledConnection(FakeCheckout(cnx))
+
+
+def test_statements_outlive_the_checkout_and_return_rolls_back():
+    cnx = FakeConnection()
+    for _ in range(3):
+        conn = checkout(cnx)
+        assert repository._fetch(conn, "SELECT ?", (1,)) == [(1,)]
+        conn.close()
+    assert cnx.prepared == 1
+    assert cnx.rollbacks == 3
+
+
+def test_stale_handle_is_prepared_again():
+    cnx = FakeConnection()
+    conn = checkout(cnx)
+    repository._fetch(conn, "SELECT ?", (1,))
+    cnx.fail = [errors.DatabaseError(msg="Unknown prepared statement handler", errno=1243)]
+    assert repository._fetch(conn, "SELECT ?", (1,)) == [(1,)]
+    assert cnx.prepared == 2 and cnx.reconnects == 0
+    conn.close()
+
+
+def test_lost_connection_reconnects_before_preparing_again():
+    cnx = FakeConnection()
+    conn = checkout(cnx)
+    cnx.fail = [errors.OperationalError(msg="Lost connection", errno=2013)]
+    assert repository._fetch(conn, "SELECT ?", (1,)) == [(1,)]
+    assert cnx.reconnects == 1 and cnx.prepared == 2
+    conn.close()
+
+
+def test_other_errors_are_not_retried():
+    cnx = FakeConnection()
+    conn = checkout(cnx)
+    cnx.fail = [errors.ProgrammingError(msg="syntax", errno=1064)]
+    with pytest.raises(errors.ProgrammingError):
+        repository._fetch(conn, "SELEC ?", (1,))
+    assert len(cnx.executed) == 1
+    conn.close()
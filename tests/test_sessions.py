@@ -0,0 +1,68 @@
+# tests/test_sessions.py
+import time
+import pytest
+from sessions import MemorySessionStore, RedisSessionStore, LocalRedis
+
+TTL = 0.3
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request):
+    if request.param == "memory":
+        return MemorySessionStore(maxsize=100, ttl=TTL)
+    return RedisSessionStore(LocalRedis(), ttl=TTL)
+
+
+def test_session_round_trip_and_miss(store):
+    assert store.get("a") is None
+    store.set("a", {"language": "hi"})
+    assert store.get("a") == {"language": "hi"}
+    assert store.stats()["hits"] == 1
+    assert store.stats()["misses"] == 1
+
+
+def test_session_expires_after_ttl(store):
+    store.set("a", {"language": "or"})
+    time.sleep(TTL + 0.1)
+    assert store.get("a") is None
+
+
+def test_touch_restarts_ttl(store):
+    store.set("a", {"language": "en"})
+    time.sleep(TTL * 0.7)
+    store.touch("a", {"language": "en"})
+    time.sleep(TTL * 0.7)
+    assert store.get("a") == {"language": "en"}
+
+
+def test_delete(store):
+    store.set("a", {"language": "en"})
+    store.delete("a")
+    assert store.get("a") is None
+
+
+def test_memory_store_is_bounded():
+    store = MemorySessionStore(maxsize=2, ttl=TTL)
+    for sender in "abc":
+        store.set(sender, {"language": "en"})
+    assert store.get("a") is None
+    assert store.stats()["evictions"] == 1
+
+
+def test_active_conversation_keeps_its_language(monkeypatch):
+    import bot
+    import knowledge
+    import translation
+    index = knowledge.KnowledgeIndex([(1, "malaria")], [(1, "fever")], [(1, 1)], [(1, "use nets")])
+    monkeypatch.setattr(knowledge, "_index", index)
+    monkeypatch.setattr(knowledge, "_index_version", 1)
+    monkeypatch.setattr(knowledge, "KNOWLEDGE_VERSION_CHECK", 0)
+    monkeypatch.setattr(translation, "_backend", translation.StubBackend())
+    monkeypatch.setattr(bot, "session_store", MemorySessionStore(maxsize=100, ttl=TTL))
+
+    sender = "whatsapp:+911"
+    assert bot.handle_message(sender, "english").startswith("You selected English")
+    for _ in range(3):
+        time.sleep(TTL * 0.5)
+        assert "malaria" in bot.handle_message(sender, "malaria")
+    assert bot.get_session(sender)["language"] == "en"
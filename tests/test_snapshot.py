@@ -0,0 +1,46 @@
+# tests/test_snapshot.py
+import os
+import snapshot
+from knowledge import KnowledgeIndex
+
+ROWS = (
+    [(1, "malaria"), (2, "dengue"), (3, "टाइफाइड")],
+    [(10, "Fever"), (11, "Joint Pain"), (12, "headache"), (13, "rash")],
+    [(1, 10), (1, 12), (2, 10), (2, 11), (2, 13), (3, 10), (3, 12)],
+    [(1, "Use nets"), (1, "Repellent, at dusk"), (2, "Remove standing water"), (3, "Boil water")],
+    [("dengue fever", 2), ("typhoid", 3)],
+    [("feverish", 10), ("joint ache", 11)],
+)
+
+
+def test_index_from_snapshot_answers_like_the_index_from_rows(tmp_path):
+    path = str(tmp_path / "kb.snap")
+    snapshot.write(path, snapshot.build(*ROWS, version=7))
+    snap = snapshot.Snapshot(path)
+    assert snap.version == 7
+
+    from_rows = KnowledgeIndex(*ROWS)
+    from_snapshot = KnowledgeIndex(*snap.knowledge_rows())
+    for name in ("malaria", "dengue fever", "typhoid", "maleria", "टाइफाइड"):
+        assert from_snapshot.disease_info(name) == from_rows.disease_info(name)
+    for symptoms in (["fever"], ["jont pain"], ["feverish", "rash"], ["ache"]):
+        assert from_snapshot.ranked_diseases(symptoms, 3) == from_rows.ranked_diseases(symptoms, 3)
+
+
+def test_current_picks_up_a_replaced_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "kb.snap")
+    monkeypatch.setattr(snapshot, "KNOWLEDGE_SNAPSHOT", path)
+    monkeypatch.setattr(snapshot, "_current", None)
+    assert snapshot.current() is None
+
+    snapshot.write(path, snapshot.build(*ROWS, version=1))
+    monkeypatch.setattr(snapshot, "_checked_at", 0.0)
+    first = snapshot.current()
+    assert first.version == 1
+
+    snapshot.write(path, snapshot.build(*ROWS, version=2))
+    monkeypatch.setattr(snapshot, "_checked_at", 0.0)
+    assert snapshot.current().version == 2
+    # the old mapping stays readable for requests still holding it
+    assert first.disease_name(0) == "malaria"
+    assert not [f for f in os.listdir(tmp_path) if f.endswith(".tmp")]
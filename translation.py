@@ -0,0 +1,184 @@
+# translation.py
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from cache import LRUCache
+from config import TRANSLATOR_BACKEND, TRANSLATION_CACHE_SIZE, TRANSLATION_CACHE_PATH, TRANSLATE_URL
+
+
+class GoogleBackend:
+    """deep_translator's GoogleTranslator; imported lazily so tests never need it."""
+
+    def translate(self, text, source, target):
+        from deep_translator import GoogleTranslator
+        return GoogleTranslator(source=source, target=target).translate(text)
+
+
+class LibreTranslateBackend:
+    """
+    HTTP backend for a LibreTranslate-compatible server (POST /translate).
+    Offers translate_async so the ASGI server never blocks on the network.
+    """
+
+    def __init__(self, url):
+        self.url = url.rstrip("/") + "/translate"
+        self._async_client = None
+
+    def _payload(self, text, source, target):
+        return {"q": text, "source": source, "target": target, "format": "text"}
+
+    def translate(self, text, source, target):
+        import httpx
+        r = httpx.post(self.url, json=self._payload(text, source, target), timeout=10)
+        r.raise_for_status()
+        return r.json()["translatedText"]
+
+    async def translate_async(self, text, source, target):
+        import httpx
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(timeout=10)
+        r = await self._async_client.post(self.url, json=self._payload(text, source, target))
+        r.raise_for_status()
+        return r.json()["translatedText"]
+
+
+class StubBackend:
+    """Offline stand-in: tags the text with the target language and counts calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def translate(self, text, source, target):
+        self.calls += 1
+        return f"[{target}] {text}"
+
+
+class TranslationStore:
+    """SQLite file that keeps translations across restarts."""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS translations (
+                    source TEXT,
+                    target TEXT,
+                    text_hash TEXT,
+                    translated TEXT,
+                    PRIMARY KEY (source, target, text_hash)
+                )
+            """)
+            self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT translated FROM translations WHERE source = ? AND target = ? AND text_hash = ?",
+                key
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, translated):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations (source, target, text_hash, translated) VALUES (?, ?, ?, ?)",
+                key + (translated,)
+            )
+            self._conn.commit()
+
+
+if TRANSLATOR_BACKEND == "stub":
+    _backend = StubBackend()
+elif TRANSLATOR_BACKEND == "libretranslate":
+    _backend = LibreTranslateBackend(TRANSLATE_URL)
+else:
+    _backend = GoogleBackend()
+_memory = LRUCache(TRANSLATION_CACHE_SIZE)
+_store = TranslationStore(TRANSLATION_CACHE_PATH) if TRANSLATION_CACHE_PATH else None
+_stats = {"backend_calls": 0, "store_hits": 0}
+
+
+def set_backend(backend):
+    """Swap the translator (anything with translate(text, source, target))."""
+    global _backend
+    _backend = backend
+
+
+def set_store(store):
+    global _store
+    _store = store
+
+
+def _key(text, source, target):
+    return (source, target, hashlib.sha256(text.encode("utf-8")).hexdigest())
+
+
+def _cached(key):
+    cached = _memory.get(key)
+    if cached is not None:
+        return cached
+    if _store is not None:
+        cached = _store.get(key)
+        if cached is not None:
+            _stats["store_hits"] += 1
+            _memory.set(key, cached)
+    return cached
+
+
+def _remember(key, translated):
+    _stats["backend_calls"] += 1
+    _memory.set(key, translated)
+    if _store is not None:
+        _store.set(key, translated)
+
+
+def translate(text, source="auto", target="en"):
+    """Translate `text`, answering from the LRU, then the persistent store, then the backend."""
+    if not text or not text.strip() or source == target:
+        return text
+
+    key = _key(text, source, target)
+    cached = _cached(key)
+    if cached is not None:
+        return cached
+
+    translated = _backend.translate(text, source, target)
+    _remember(key, translated)
+    return translated
+
+
+async def translate_async(text, source="auto", target="en"):
+    """Same as translate(), but awaits the backend (natively or on a worker thread) on a miss."""
+    if not text or not text.strip() or source == target:
+        return text
+
+    key = _key(text, source, target)
+    cached = _cached(key)
+    if cached is not None:
+        return cached
+
+    backend_async = getattr(_backend, "translate_async", None)
+    if backend_async is not None:
+        translated = await backend_async(text, source, target)
+    else:
+        translated = await asyncio.to_thread(_backend.translate, text, source, target)
+    _remember(key, translated)
+    return translated
+
+
+def prewarm(texts, languages=("hi", "or"), source="en"):
+    """Translate known static texts ahead of time; failures are logged, not raised."""
+    for lang in languages:
+        for text in texts:
+            try:
+                translate(text, source=source, target=lang)
+            except Exception as e:
+                print("Translation prewarm failed:", lang, e)
+
+
+def stats():
+    s = dict(_stats)
+    s["memory"] = _memory.stats()
+    return s
@@ -0,0 +1,7 @@
+# wsgi.py
+# Production entry point (the Flask dev server in bot.py is for local use only):
+#   gunicorn wsgi:app --workers 2 --threads 8 --bind 0.0.0.0:5000
+# Caches warm in the background (WARMUP_MODE); point the load balancer's readiness probe at /ready.
+from bot import create_app
+
+app = create_app()